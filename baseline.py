@@ -0,0 +1,35 @@
+import argparse
+import sys
+import time
+
+from utils.baseline import BASELINE_METRICS, build_baseline, default_baseline_path
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(
+        description='Build the random-permutation baseline used for percentile ranking.'
+    )
+    parser.add_argument('-n', '--count', type=int, default=100_000,
+                        help='Number of random S-boxes (default: 100000)')
+    parser.add_argument('--size', type=int, default=256, help='S-box length 2^n (default: 256)')
+    parser.add_argument('--seed', type=int, default=0, help='Sampling seed (default: 0)')
+    parser.add_argument('-w', '--workers', type=int, default=None,
+                        help='Worker processes (default: number of CPUs)')
+    parser.add_argument('-o', '--output', help='Artifact path (default: next to the result store)')
+    return parser.parse_args(argv)
+
+def main(argv=None):
+    args = parse_args(argv)
+    path = args.output or default_baseline_path(args.count, args.size, args.seed)
+
+    start = time.perf_counter()
+    baseline = build_baseline(args.count, args.size, args.seed, args.workers)
+    baseline.save(path)
+    print(f'Sampled {args.count} S-boxes in {time.perf_counter() - start:.1f}s -> {path}', file=sys.stderr)
+
+    for metric in BASELINE_METRICS:
+        values, counts = baseline.histograms[metric]
+        median = values[(counts.cumsum() >= counts.sum() / 2).argmax()]
+        print(f'{metric:8s} {len(values):5d} distinct values, median {median:g}, range {values[0]:g}..{values[-1]:g}')
+
+if __name__ == '__main__':
+    main()
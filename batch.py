@@ -0,0 +1,119 @@
+import argparse
+import sys
+import time
+
+from utils.batch import read_sboxes, evaluate_batch
+from utils.metrics import METRICS, resolve_metrics
+from utils.screening import parse_bound
+from utils.result_writer import WRITER_FORMATS, open_result_writer
+from utils.result_store import STORE_PATH_VARIABLE, configured_store_path
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(
+        description='Evaluate many S-boxes without the Streamlit UI.'
+    )
+    parser.add_argument('input', help='Multi-row CSV, NPY/BIN/hex file, or directory of S-box files')
+    parser.add_argument('--sbox-size', type=int, default=None,
+                        help='Entries per S-box in BIN/hex files (default: 256 if it divides the file)')
+    parser.add_argument('-o', '--output', help='Output file (default: stdout)')
+    parser.add_argument(
+        '-f', '--format', choices=list(WRITER_FORMATS),
+        help='Output format (default: from the output file extension, else csv). '
+             'Rows are streamed; parquet needs pyarrow and an output file'
+    )
+    parser.add_argument('--row-group-size', type=int, default=10000,
+                        help='Rows per Parquet row group (default: 10000)')
+    parser.add_argument(
+        '-m', '--metrics',
+        help=f"Comma-separated metrics (default: all). Available: {', '.join(METRICS)}"
+    )
+    parser.add_argument(
+        '-r', '--require', action='append', default=[], metavar='BOUND', type=parse_bound,
+        help='Screen first and skip metrics for S-boxes violating BOUND, '
+             'e.g. -r "nl>=104" -r "du<=6" -r bijective (repeatable)'
+    )
+    parser.add_argument('-w', '--workers', type=int, default=None,
+                        help='Worker processes (default: number of CPUs)')
+    parser.add_argument('--chunk-size', type=int, default=64,
+                        help='S-boxes per worker task (default: 64)')
+    parser.add_argument('--store', metavar='PATH', default=configured_store_path(),
+                        help='SQLite result store to reuse and record results in '
+                             f'(default: ${STORE_PATH_VARIABLE}, else no store)')
+    parser.add_argument('--no-store', dest='store', action='store_const', const=None,
+                        help=f'Ignore ${STORE_PATH_VARIABLE}: compute everything and write no store')
+    parser.add_argument('--dedup', action='store_true',
+                        help='Evaluate one S-box per class of input/output translates S(x^c)^d '
+                             '(all metrics are equal within a class) and copy its results')
+    parser.add_argument('-q', '--quiet', action='store_true', help='Do not report progress')
+    return parser.parse_args(argv)
+
+def main(argv=None):
+    args = parse_args(argv)
+    metrics = resolve_metrics(args.metrics.split(',') if args.metrics else None)
+    bounds = dict(args.require)
+
+    def log(message):
+        if not args.quiet:
+            print(message, file=sys.stderr)
+
+    wall_start = time.perf_counter()
+    try:
+        sboxes = read_sboxes(args.input, args.sbox_size)
+    except ValueError as e:
+        sys.exit(f'batch.py: error: {e}')
+    read_time = time.perf_counter() - wall_start
+    log(f'Read {len(sboxes)} S-boxes in {read_time:.2f}s')
+    if args.store:
+        log(f'Result store: {args.store}')
+    non_bijective = sum(not entry.bijective for entry in sboxes)
+    if non_bijective:
+        log(f'{non_bijective}/{len(sboxes)} S-boxes are not bijective')
+
+    columns = ['index', 'source'] + (['rejected_by'] if bounds else []) + metrics
+    try:
+        writer = open_result_writer(args.output, columns, args.format, args.row_group_size)
+    except (ValueError, ImportError) as e:
+        sys.exit(f'batch.py: error: {e}')
+
+    stages = ['validate'] + (['screen'] if bounds else []) + (['store'] if args.store else []) + metrics
+    stage_times = dict.fromkeys(stages, 0.0)
+    rejected = 0
+    reused = 0
+    copied = 0
+    compute_start = time.perf_counter()
+
+    with writer:
+        labels = [entry.label for entry in sboxes]
+        results = evaluate_batch([entry.sbox for entry in sboxes], metrics, args.workers, args.chunk_size, bounds, args.store, args.dedup)
+        for index, (row, timings) in enumerate(results):
+            writer.write({'index': index, 'source': labels[index], **row})
+            rejected += row.get('rejected_by') is not None
+            if timings:
+                reused += sum(name in row and name not in timings for name in metrics)
+            else:
+                copied += 1
+            for stage, seconds in timings.items():
+                stage_times[stage] += seconds
+
+            done = index + 1
+            if done % 100 == 0 or done == len(sboxes):
+                elapsed = time.perf_counter() - compute_start
+                log(f'{done}/{len(sboxes)} S-boxes ({done / elapsed:.1f}/s)')
+
+    if bounds:
+        log(f'{rejected}/{len(sboxes)} S-boxes rejected by screening bounds')
+
+    if args.dedup:
+        log(f'{copied}/{len(sboxes)} S-boxes were translates of an earlier one; results copied')
+    if args.store:
+        log(f'{reused} metric values reused from {args.store}')
+
+    # Per-stage wall-clock time measured inside each worker, summed over all workers
+    log('Stage timings (wall-clock seconds summed over workers):')
+    log(f'  read: {read_time:.3f}s')
+    for stage, seconds in stage_times.items():
+        log(f'  {stage}: {seconds:.3f}s')
+    log(f'Total wall time: {time.perf_counter() - wall_start:.2f}s')
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,64 @@
+"""
+Check that importing the metric API stays cheap
+
+Usage (from the repository root):
+
+    python -m benchmarks.check_import_time [--budget SECONDS]
+
+Imports `utils` in a fresh interpreter, measures the import time and fails
+when it exceeds the budget or when a UI/export dependency (streamlit,
+pandas, xlsxwriter, openpyxl) gets pulled in by the compute core.
+"""
+import argparse
+import json
+import subprocess
+import sys
+
+# Modules that must only be loaded by the export / UI layers
+HEAVY_MODULES = ['streamlit', 'pandas', 'xlsxwriter', 'openpyxl']
+
+DEFAULT_BUDGET_SECONDS = 0.5
+
+_PROBE = """
+import json, sys, time
+start = time.perf_counter()
+import utils
+utils.compute_nonlinearity
+elapsed = time.perf_counter() - start
+print(json.dumps({'seconds': elapsed, 'modules': sorted(m for m in %r if m in sys.modules)}))
+"""
+
+def measure_import(runs=3):
+    """Best import time over several fresh interpreters, and heavy modules seen"""
+    best, heavy = float('inf'), set()
+    for _ in range(runs):
+        output = subprocess.run(
+            [sys.executable, '-c', _PROBE % HEAVY_MODULES],
+            check=True, capture_output=True, text=True
+        ).stdout
+        probe = json.loads(output)
+        best = min(best, probe['seconds'])
+        heavy.update(probe['modules'])
+    return best, sorted(heavy)
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Check the import time of the metric API.')
+    parser.add_argument('--budget', type=float, default=DEFAULT_BUDGET_SECONDS,
+                        help=f'Maximum import time in seconds (default: {DEFAULT_BUDGET_SECONDS})')
+    args = parser.parse_args(argv)
+
+    seconds, heavy = measure_import()
+    print(f'import utils: {seconds * 1e3:.1f} ms (budget {args.budget * 1e3:.0f} ms)')
+
+    failures = []
+    if seconds > args.budget:
+        failures.append(f'import time {seconds * 1e3:.1f} ms exceeds budget')
+    if heavy:
+        failures.append(f"compute core imports UI/export modules: {', '.join(heavy)}")
+
+    for failure in failures:
+        print(f'FAIL {failure}', file=sys.stderr)
+    return 1 if failures else 0
+
+if __name__ == '__main__':
+    sys.exit(main())
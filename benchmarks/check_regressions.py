@@ -0,0 +1,305 @@
+"""
+Regression checks for behaviour that the benchmark corpus does not cover
+
+Usage (from the repository root):
+
+    python -m benchmarks.check_regressions
+
+Every check returns a list of failure messages; the exit status is non-zero
+when any check fails.
+"""
+import io
+import sys
+
+import numpy as np
+
+from benchmarks.corpus import AES_SBOX, random_permutation
+from utils.avalanche_criterion import strict_avalanche_criterion
+from utils.batch import evaluate_batch
+from utils.boomerang_connectivity import boomerang_connectivity_table
+from utils.boomerang_uniformity import compute_boomerang_uniformity
+from utils.incremental import SwapEvaluator
+from utils.metrics import METRICS
+from utils.loaders import parse_sbox_bytes, parse_sbox_text
+from utils.sbox_profile import SboxProfile
+from utils.screening import BOUND_ORDER, screen_sbox
+from utils.service import EvaluationService, parse_evaluation_request
+from utils.trails import PRESENT_PERMUTATION, TRAIL_KINDS, best_trail_weights, transition_weights
+
+PRESENT_SBOX = [0xC, 0x5, 0x6, 0xB, 0x9, 0x0, 0xA, 0xD, 0x3, 0xE, 0xF, 0x8, 0x4, 0x7, 0x1, 0x2]
+
+# Best differential / linear trail weights of 1..6 rounds of PRESENT
+PRESENT_TRAIL_WEIGHTS = {
+    'differential': [2, 4, 8, 12, 20, 24],
+    'linear': [2, 4, 8, 12, 16, 20],
+}
+
+def check_hex_text():
+    """Plain hex input with and without 0x prefixes, continuous hex and comments"""
+    failures = []
+    for label, sbox in [('present', PRESENT_SBOX), ('aes', AES_SBOX)]:
+        expected = np.array([sbox])
+        continuous = ''.join(f'{value:02x}' for value in sbox)
+        texts = {
+            'bare bytes': ' '.join(f'{value:02x}' for value in sbox),
+            '0x list': ', '.join(f'0x{value:02X}' for value in sbox),
+            '0x lines': '\n'.join(f'0x{value:x}' for value in sbox),
+            'continuous': continuous,
+            'xxd -p lines': '\n'.join(continuous[start:start + 60] for start in range(0, len(continuous), 60)),
+            '# header': f'# {label} S-box\n' + ' '.join(f'{value:x}' for value in sbox),
+        }
+        for name, text in texts.items():
+            parsed = parse_sbox_text(text)
+            if parsed.shape != expected.shape or not np.array_equal(parsed, expected):
+                failures.append(f'parse_sbox_text({label}, {name}): got shape {parsed.shape}')
+
+    for text in ['123 45', '{0x12345, 0x1}']:
+        try:
+            parse_sbox_text(text)
+            failures.append(f'parse_sbox_text({text!r}): no ValueError')
+        except ValueError:
+            pass
+    return failures
+
+def check_npy_layout():
+    """A 16x16 .npy grid is one AES S-box; (k, 2^n) and (k, 16, 16) arrays hold k"""
+    aes = np.array(AES_SBOX, dtype=np.uint8)
+    layouts = {
+        'grid': (aes.reshape(16, 16), 1),
+        'rows': (np.stack([aes, aes[::-1]]), 2),
+        'grid stack': (np.stack([aes.reshape(16, 16)] * 3), 3),
+    }
+    failures = []
+    for name, (array, count) in layouts.items():
+        buffer = io.BytesIO()
+        np.save(buffer, array)
+        sboxes = parse_sbox_bytes(buffer.getvalue(), 'sboxes.npy').sboxes
+        if sboxes.shape != (count, 256) or not np.array_equal(sboxes[0], aes):
+            failures.append(f'.npy {name} {array.shape}: got S-boxes {sboxes.shape}')
+    return failures
+
+def check_service_cache():
+    """text/plain 0x bodies, the S-box size limit and cached None results (BU of a non-bijective S-box)"""
+    failures = []
+    body = ', '.join(f'0x{value:02x}' for value in PRESENT_SBOX).encode()
+    sboxes, _ = parse_evaluation_request(body, 'text/plain', {})
+    if [list(sbox) for sbox in sboxes] != [PRESENT_SBOX]:
+        failures.append(f'text/plain 0x body: got {len(sboxes)} S-boxes of {[len(sbox) for sbox in sboxes]} entries')
+
+    try:
+        parse_evaluation_request(b'{"sbox": [%s]}' % ','.join(map(str, range(1 << 16))).encode(), 'application/json', {})
+        failures.append('service accepted a 16-bit S-box (4^16-entry tables)')
+    except ValueError:
+        pass
+
+    service = EvaluationService()
+    constant = [0] * 16
+    first = service.evaluate([constant], ['bu'])
+    hits = service.results.hits
+    second = service.evaluate([constant], ['bu'])
+    if first != second or first[0]['bu'] is not None:
+        failures.append(f'service bu of a constant S-box: {first} then {second}')
+    if service.results.hits != hits + 1:
+        failures.append('service recomputed a cached None result')
+    return failures
+
+def _swap_state_failures(label, evaluator):
+    """Differences between the incremental tables and a full recomputation"""
+    profile = SboxProfile(evaluator.tolist(), output_bits=evaluator.output_bits)
+    failures = []
+    if not np.array_equal(evaluator.ddt, profile.ddt):
+        failures.append(f'{label}: DDT differs from recomputation')
+    if not np.array_equal(evaluator.walsh, profile.walsh_spectrum):
+        failures.append(f'{label}: Walsh spectrum differs from recomputation')
+    if not np.array_equal(evaluator.derivatives, profile.avalanche):
+        failures.append(f'{label}: avalanche derivatives differ from recomputation')
+    if evaluator.sac() != strict_avalanche_criterion(profile):
+        failures.append(f'{label}: SAC differs from recomputation')
+    return failures
+
+def check_swap_evaluator(swaps=200, seed=0):
+    """SwapEvaluator tables after random swaps and undos match a full recomputation"""
+    rng = np.random.default_rng(seed)
+    failures = []
+    for label, sbox in [('present', PRESENT_SBOX), ('aes', AES_SBOX), ('random_1', random_permutation(1))]:
+        evaluator = SwapEvaluator(sbox)
+        for step in range(swaps):
+            i, j = rng.integers(len(sbox), size=2)
+            evaluator.swap(int(i), int(j))
+            if rng.random() < 0.3:
+                evaluator.undo()
+            if step % 50 == 49:
+                failures += _swap_state_failures(f'{label} after {step + 1} steps', evaluator)
+        while evaluator.history:
+            evaluator.undo()
+        if evaluator.tolist() != list(sbox):
+            failures.append(f'{label}: undoing every swap does not restore the S-box')
+        failures += _swap_state_failures(f'{label} after undoing every swap', evaluator)
+    return failures
+
+def check_dedup(seed=0):
+    """evaluate_batch(dedup=True) matches evaluating every S-box, also for translates of different widths"""
+    rng = np.random.default_rng(seed)
+    narrow = rng.integers(128, size=256).tolist()  # Inferred output width 7
+    sboxes = [narrow, [value ^ 0x80 for value in narrow], [value ^ 0x15 for value in narrow],
+              AES_SBOX, [AES_SBOX[x ^ 0x3c] ^ 0x5a for x in range(256)]]
+    metrics = ['nl', 'du', 'sac', 'bic_sac']
+    full = [results for results, _ in evaluate_batch(sboxes, metrics, workers=1)]
+    deduplicated = [results for results, _ in evaluate_batch(sboxes, metrics, workers=1, dedup=True)]
+    return [f'dedup S-box {index}: {got} instead of {expected}'
+            for index, (got, expected) in enumerate(zip(deduplicated, full)) if got != expected]
+
+def check_output_width():
+    """8-bit S-boxes are 8 bits wide even when every value is below 128; smaller tables infer m"""
+    narrow = [value & 0x7f for value in AES_SBOX]
+    widths = {
+        '8-bit, values < 128': (SboxProfile(narrow).output_bits, 8),
+        '6x4': (SboxProfile([x % 16 for x in range(64)]).output_bits, 4),
+        'present': (SboxProfile(PRESENT_SBOX).output_bits, 4),
+    }
+    failures = [f'output width of {name}: {got} instead of {expected}'
+                for name, (got, expected) in widths.items() if got != expected]
+    if strict_avalanche_criterion(narrow)[0] != strict_avalanche_criterion(SboxProfile(narrow, output_bits=8))[0]:
+        failures.append('SAC of an 8-bit S-box depends on its largest value')
+    return failures
+
+def _brute_force_trail_weights(sbox, matrix, num_sboxes, rounds, kind):
+    """Best trail weights by dynamic programming over every state of a small SPN"""
+    sbox_bits = len(sbox).bit_length() - 1
+    states = np.arange(1 << (sbox_bits * num_sboxes))
+    weights = transition_weights(sbox, kind).astype(np.float32)
+
+    # step[x, y]: weight of S-box layer input x -> output y
+    step = np.zeros((len(states), len(states)), dtype=np.float32)
+    for position in range(num_sboxes):
+        part = (states >> (sbox_bits * position)) & (len(sbox) - 1)
+        step += weights[np.ix_(part, part)]
+
+    def apply(rows, values):
+        """rows x values over GF(2), as state integers"""
+        result = np.zeros_like(values)
+        for column in range(rows.shape[1]):
+            image = sum(1 << int(row) for row in np.flatnonzero(rows[:, column]))
+            result ^= np.where((values >> column) & 1, image, 0)
+        return result
+
+    # Differences move through M; the next mask w satisfies M^T w = v
+    if kind == 'differential':
+        following = apply(matrix, states)
+    else:
+        following = np.empty_like(states)
+        following[apply(matrix.T, states)] = states
+
+    best = step.min(axis=1)
+    found = [float(best[1:].min())]
+    for _ in range(rounds - 1):
+        best = (step + best[following]).min(axis=1)
+        found.append(float(best[1:].min()))
+    return found
+
+def check_trail_search(seed=0):
+    """PRESENT trail bounds for 1..6 rounds, and a brute-force comparison on small SPNs"""
+    failures = []
+    for kind in TRAIL_KINDS:
+        found = best_trail_weights(PRESENT_SBOX, PRESENT_PERMUTATION, 16, 6, kind, workers=1)
+        if found != PRESENT_TRAIL_WEIGHTS[kind]:
+            failures.append(f'PRESENT {kind} trails: {found} instead of {PRESENT_TRAIL_WEIGHTS[kind]}')
+
+    rng = np.random.default_rng(seed)
+    num_sboxes, rounds = 3, 4
+    state_bits = 4 * num_sboxes
+    for trial in range(3):
+        sbox = rng.permutation(16).tolist()
+        if trial == 0:
+            matrix = np.eye(state_bits, dtype=bool)[rng.permutation(state_bits)].T
+        else:
+            # Random invertible GF(2) matrix: triangular factors L U
+            lower = np.tril(rng.integers(2, size=(state_bits, state_bits)), -1) + np.eye(state_bits, dtype=int)
+            upper = np.triu(rng.integers(2, size=(state_bits, state_bits)), 1) + np.eye(state_bits, dtype=int)
+            matrix = (lower @ upper % 2).astype(bool)
+        for kind in TRAIL_KINDS:
+            found = best_trail_weights(sbox, matrix, num_sboxes, rounds, kind, workers=1)
+            expected = _brute_force_trail_weights(sbox, matrix, num_sboxes, rounds, kind)
+            if not np.allclose(found, expected):
+                failures.append(f'{kind} trails of random SPN {trial}: {found} instead of {expected}')
+    return failures
+
+def _brute_force_bct(sbox):
+    """BCT by its definition #{x : S^-1(S(x) xor b) xor S^-1(S(x xor a) xor b) = a}"""
+    values = np.asarray(sbox)
+    inverse = np.argsort(values)
+    size = len(values)
+    a, b, x = np.ogrid[:size, :size, :size]
+    returned = inverse[values[x] ^ b] ^ inverse[values[x ^ a] ^ b]
+    return np.count_nonzero(returned == a, axis=2)
+
+def check_boomerang(trials=5, seed=0):
+    """BCT against its definition on random 4- and 5-bit permutations; AES BU = 6"""
+    rng = np.random.default_rng(seed)
+    failures = []
+    for bits in (4, 5):
+        for trial in range(trials):
+            sbox = rng.permutation(1 << bits).tolist()
+            expected = _brute_force_bct(sbox)
+            if not np.array_equal(boomerang_connectivity_table(sbox, output_bits=bits), expected):
+                failures.append(f'BCT of random {bits}-bit permutation {trial} differs from the definition')
+            if not np.array_equal(SboxProfile(sbox).bct, expected):
+                failures.append(f'SboxProfile.bct of random {bits}-bit permutation {trial} differs from the definition')
+
+    uniformity = compute_boomerang_uniformity(AES_SBOX)
+    if uniformity != 6:
+        failures.append(f'AES boomerang uniformity: {uniformity} instead of 6')
+    return failures
+
+def _violates(name, limit, metrics):
+    """Whether fully computed metrics violate one screening bound"""
+    if name == 'bijective':
+        return not metrics['bijective']
+    value = metrics[name.rsplit('_', 1)[0]]
+    if value is None:  # BU of a non-bijective S-box
+        return True
+    return value < limit if name.endswith('_min') else value > limit
+
+def check_screening(trials=200, seed=0):
+    """screen_sbox() with early exit gives the verdict of full evaluation"""
+    rng = np.random.default_rng(seed)
+    failures = []
+    for trial in range(trials):
+        size = int(rng.choice([16, 64, 256]))
+        sbox = rng.permutation(size) if rng.random() < 0.8 else rng.integers(size, size=size)
+        profile = SboxProfile(sbox.tolist())
+        metrics = {name: METRICS[name](profile) for name in ('du', 'dap', 'nl', 'bic_nl', 'lap', 'bu')}
+        metrics['bijective'] = profile.is_bijective
+
+        # Limits next to the actual values, so both verdicts occur
+        bounds = {}
+        for name in rng.choice(BOUND_ORDER, size=int(rng.integers(1, 4)), replace=False).tolist():
+            if name == 'bijective':
+                bounds[name] = True
+                continue
+            value = metrics[name.rsplit('_', 1)[0]]
+            step = 2 if name in ('du_max', 'bu_max', 'nl_min', 'bic_nl_min') else 2 / size
+            bounds[name] = (value if value is not None else 4) + step * int(rng.integers(-1, 2))
+
+        violated = {name for name, limit in bounds.items() if _violates(name, limit, metrics)}
+        result = screen_sbox(SboxProfile(sbox.tolist()), bounds)
+        if result.passed == bool(violated) or (violated and result.rejected_by not in violated):
+            failures.append(f'screening trial {trial} {bounds}: {result.passed, result.rejected_by}, '
+                            f'full evaluation violates {sorted(violated)}')
+    return failures
+
+CHECKS = [check_hex_text, check_npy_layout, check_service_cache, check_swap_evaluator, check_dedup, check_output_width, check_trail_search, check_boomerang, check_screening]
+
+def main(argv=None):
+    failures = []
+    for check in CHECKS:
+        found = check()
+        print(f"{'FAIL' if found else 'ok  '} {check.__name__}")
+        failures.extend(found)
+
+    for failure in failures:
+        print(f'FAIL {failure}', file=sys.stderr)
+    return 1 if failures else 0
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,97 @@
+"""
+Load test of the HTTP evaluation service
+
+Usage (from the repository root):
+
+    python -m benchmarks.load_test [--url URL] [--clients N] [--requests N]
+
+Without --url an in-process server (no result store) is started on a free
+port. Every client thread posts single random permutations, so concurrent
+requests exercise the batcher; a share of them repeats earlier S-boxes to
+hit the warm caches. Client-side throughput and latency are printed with
+the server's /stats counters.
+"""
+import argparse
+import json
+import threading
+import time
+import urllib.request
+
+import numpy as np
+
+from utils.baseline import random_permutations
+from utils.service import EvaluationService, create_server
+
+def post_json(url, payload):
+    request = urllib.request.Request(
+        f'{url}/evaluate', data=json.dumps(payload).encode(), headers={'Content-Type': 'application/json'}
+    )
+    with urllib.request.urlopen(request) as response:
+        return json.load(response)
+
+def run_clients(url, clients, requests, metrics, repeat, seed=0):
+    """Post requests from `clients` threads; returns (wall seconds, latencies, errors)"""
+    sboxes = random_permutations(max(1, int(clients * requests * (1 - repeat))), 256, seed).tolist()
+    latencies = []
+    errors = []
+    lock = threading.Lock()
+
+    def client(index):
+        rng = np.random.default_rng(seed + index + 1)
+        for _ in range(requests):
+            sbox = sboxes[rng.integers(len(sboxes))]
+            start = time.perf_counter()
+            try:
+                post_json(url, {'sbox': sbox, 'metrics': metrics})
+            except Exception as e:
+                with lock:
+                    errors.append(e)
+                continue
+            with lock:
+                latencies.append(time.perf_counter() - start)
+
+    threads = [threading.Thread(target=client, args=(index,)) for index in range(clients)]
+    start = time.perf_counter()
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    return time.perf_counter() - start, np.array(latencies), errors
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Load test the HTTP evaluation service.')
+    parser.add_argument('--url', help='Running service (default: start one in-process)')
+    parser.add_argument('-c', '--clients', type=int, default=16, help='Concurrent clients (default: 16)')
+    parser.add_argument('-n', '--requests', type=int, default=50, help='Requests per client (default: 50)')
+    parser.add_argument('-m', '--metrics', default='lap,nl,du,dap',
+                        help='Comma-separated metrics (default: lap,nl,du,dap)')
+    parser.add_argument('--repeat', type=float, default=0.5,
+                        help='Share of requests for already seen S-boxes (default: 0.5)')
+    args = parser.parse_args(argv)
+
+    server = None
+    url = args.url
+    if url is None:
+        server = create_server(EvaluationService(), port=0, quiet=True)
+        threading.Thread(target=server.serve_forever, daemon=True).start()
+        url = f'http://127.0.0.1:{server.server_address[1]}'
+
+    try:
+        seconds, latencies, errors = run_clients(url.rstrip('/'), args.clients, args.requests,
+                                                 args.metrics.split(','), args.repeat)
+        with urllib.request.urlopen(f'{url}/stats') as response:
+            stats = json.load(response)
+    finally:
+        if server is not None:
+            server.shutdown()
+            server.server_close()
+
+    print(f'{len(latencies)} requests in {seconds:.2f}s ({len(latencies) / seconds:.1f}/s), {len(errors)} errors')
+    if len(latencies):
+        p50, p90, p99 = np.percentile(latencies * 1e3, [50, 90, 99])
+        print(f'latency p50 {p50:.1f} ms, p90 {p90:.1f} ms, p99 {p99:.1f} ms')
+    print(json.dumps(stats, indent=2))
+    return 1 if errors else 0
+
+if __name__ == '__main__':
+    raise SystemExit(main())
@@ -0,0 +1,129 @@
+"""
+Benchmark every metric on a fixed S-box corpus
+
+Usage (from the repository root):
+
+    python -m benchmarks.run_benchmarks            # compare with baseline.json
+    python -m benchmarks.run_benchmarks --update   # record a new baseline
+
+Records wall time (best of several runs), peak traced memory and the result
+value of each (S-box, metric) pair. Results that differ from the baseline
+or from published values, and timings slower than the baseline by more
+than the tolerance factor, are reported and make the exit status non-zero.
+"""
+import argparse
+import json
+import os
+import platform
+import sys
+import time
+import tracemalloc
+
+import numpy as np
+
+from utils.metrics import METRICS
+from utils.entropy import compute_entropy
+from benchmarks.corpus import load_corpus, EXPECTED, EXPECTED_TOLERANCE
+
+BASELINE_PATH = os.path.join(os.path.dirname(__file__), 'baseline.json')
+
+# Timings below this many seconds are too noisy to flag as regressions
+MIN_FLAGGED_SECONDS = 0.001
+
+BENCHMARKS = dict(METRICS, entropy=lambda sbox: compute_entropy(sbox)['shannon_entropy'])
+
+def _plain(value):
+    """Convert NumPy scalars so results are JSON serializable and comparable"""
+    return value.item() if isinstance(value, np.generic) else value
+
+def measure(function, sbox, repeats):
+    """
+    Run one metric on a fresh copy of the S-box (no cached tables)
+
+    Returns:
+        dict: best wall time in seconds, peak traced bytes and the result value
+    """
+    best = float('inf')
+    for _ in range(repeats):
+        start = time.perf_counter()
+        value = function(list(sbox))
+        best = min(best, time.perf_counter() - start)
+
+    tracemalloc.start()
+    function(list(sbox))
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    return {'seconds': best, 'peak_bytes': peak, 'value': _plain(value)}
+
+def run(repeats):
+    results = {}
+    for sbox_name, sbox in load_corpus().items():
+        for metric, function in BENCHMARKS.items():
+            results[f'{sbox_name}/{metric}'] = measure(function, sbox, repeats)
+    return results
+
+def _same_value(a, b):
+    return abs(a - b) <= 1e-12 * max(1.0, abs(b))
+
+def check_expected(results):
+    """Failures against published / closed-form values"""
+    failures = []
+    for sbox_name, expected in EXPECTED.items():
+        for metric, value in expected.items():
+            got = results[f'{sbox_name}/{metric}']['value']
+            tolerance = EXPECTED_TOLERANCE.get(metric)
+            if not (_same_value(got, value) if tolerance is None else abs(got - value) <= tolerance):
+                failures.append(f'{sbox_name}/{metric}: expected {value}, got {got}')
+    return failures
+
+def compare(results, baseline, tolerance):
+    """Value changes and timing regressions against a recorded baseline"""
+    failures = []
+    for key, old in baseline['results'].items():
+        new = results.get(key)
+        if new is None:
+            failures.append(f'{key}: missing from this run')
+            continue
+        if not _same_value(new['value'], old['value']):
+            failures.append(f"{key}: value changed {old['value']} -> {new['value']}")
+        if new['seconds'] > MIN_FLAGGED_SECONDS and new['seconds'] > old['seconds'] * tolerance:
+            failures.append(f"{key}: slower {old['seconds'] * 1e3:.2f}ms -> {new['seconds'] * 1e3:.2f}ms")
+    return failures
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Benchmark S-box metrics against a recorded baseline.')
+    parser.add_argument('--baseline', default=BASELINE_PATH, help='Baseline JSON file')
+    parser.add_argument('--update', action='store_true', help='Write this run as the new baseline')
+    parser.add_argument('--repeats', type=int, default=5, help='Timed runs per metric (best is kept)')
+    parser.add_argument('--tolerance', type=float, default=1.5,
+                        help='Flag timings slower than baseline times this factor (default: 1.5)')
+    args = parser.parse_args(argv)
+
+    results = run(args.repeats)
+    for key, result in results.items():
+        print(f"{key:28s} {result['seconds'] * 1e3:9.3f} ms {result['peak_bytes'] / 1024:9.1f} KiB  {result['value']}")
+
+    failures = check_expected(results)
+
+    if args.update:
+        with open(args.baseline, 'w') as f:
+            json.dump({
+                'python': platform.python_version(),
+                'numpy': np.__version__,
+                'machine': platform.machine(),
+                'results': results,
+            }, f, indent=2, sort_keys=True)
+        print(f'Baseline written to {args.baseline}')
+    elif os.path.exists(args.baseline):
+        with open(args.baseline) as f:
+            failures += compare(results, json.load(f), args.tolerance)
+    else:
+        print(f'No baseline at {args.baseline}; run with --update to record one')
+
+    for failure in failures:
+        print(f'FAIL {failure}', file=sys.stderr)
+    return 1 if failures else 0
+
+if __name__ == '__main__':
+    sys.exit(main())
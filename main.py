@@ -1,8 +1,10 @@
 
 import streamlit as st
 import pandas as pd
-import numpy as np
-import io
+import sqlite3
+import sys
+import time
+import uuid
 
 # Import all the utility functions
 from utils.linear_approximation import linear_approximation_probability
@@ -11,8 +13,234 @@ from utils.differential_uniformity import compute_differential_uniformity
 from utils.avalanche_criterion import strict_avalanche_criterion
 from utils.differential_approximation import calculate_dap
 from utils.entropy import compute_entropy
-from utils.bit_independence import calculate_bic_sac, calculate_bic_nl
-from utils.create_result import add_download_buttons 
+from utils.bit_independence import bit_independence_sac, bit_independence_nonlinearity, output_bit_pairs
+from utils.algebraic import algebraic_properties
+from utils.autocorrelation import autocorrelation_properties
+from utils.sbox_profile import SboxProfile, sbox_digest
+from utils.helpers import grid_shape, is_power_of_two
+from utils.instrumentation import instrumented_call, format_timing
+from utils.loaders import parse_sbox_bytes, SBOX_EXTENSIONS
+from utils.metrics import METRIC_VERSIONS
+from utils.result_store import ResultStore, configured_store_path
+from utils.jobs import JobManager
+from utils.baseline import find_baseline, load_or_build_baseline
+
+# Metric functions behind the sidebar options, keyed by the result name
+METRIC_FUNCTIONS = {
+    'lap': linear_approximation_probability,
+    'nonlinearity': compute_nonlinearity,
+    'sac': strict_avalanche_criterion,
+    'dap': calculate_dap,
+    'bic_sac': bit_independence_sac,
+    'bic_nl': bit_independence_nonlinearity,
+    'algebraic': lambda profile: algebraic_properties(profile)._asdict(),
+    'autocorrelation': lambda profile: autocorrelation_properties(profile)._asdict(),
+}
+
+@st.cache_data(max_entries=32, show_spinner=False)
+def load_sbox(file_bytes, file_name):
+    """Parse an uploaded S-box file, cached by its content"""
+    return parse_sbox_bytes(file_bytes, file_name)
+
+@st.cache_resource(max_entries=16, show_spinner=False)
+def get_profile(digest, _sbox):
+    """Keep one SboxProfile (and its derived tables) per distinct S-box"""
+    return SboxProfile(_sbox)
+
+# Random permutations sampled when the baseline is built from the app
+# (baseline.py builds larger ones offline)
+BASELINE_BUILD_COUNT = 10_000
+
+# Metric job behind each sidebar option
+OPTION_METRICS = {
+    'Linear Approximation Probability (LAP)': 'lap',
+    'Nonlinearity': 'nonlinearity',
+    'Strict Avalanche Criterion (SAC)': 'sac',
+    'Differential Approximation Probability (DAP)': 'dap',
+    'Bit Independence Criterion - SAC (BIC-SAC)': 'bic_sac',
+    'Bit Independence Criterion - Nonlinearity (BIC-NL)': 'bic_nl',
+    'Algebraic Degree & ANF': 'algebraic',
+    'Autocorrelation & Linear Structures': 'autocorrelation',
+}
+
+# Result store entry of each metric, as in METRIC_VERSIONS
+STORE_NAMES = {
+    'lap': 'lap',
+    'nonlinearity': 'nl',
+    'sac': 'sac_matrix',
+    'dap': 'dap',
+    'bic_sac': 'bic_sac_matrix',
+    'bic_nl': 'bic_nl_matrix',
+    'algebraic': 'algebraic',
+    'autocorrelation': 'autocorrelation',
+}
+
+@st.cache_resource(show_spinner=False)
+def get_result_store():
+    """
+    Result store shared by all sessions
+
+    Opt-in through $SBOX_RESULT_STORE; None when it is not set or the store
+    cannot be opened.
+    """
+    path = configured_store_path()
+    if path is None:
+        return None
+    try:
+        store = ResultStore(path)
+    except (OSError, sqlite3.Error) as e:
+        print(f'Result store {path} unavailable: {e}', file=sys.stderr)
+        return None
+    print(f'Result store: {store.path}', file=sys.stderr)
+    return store
+
+@st.cache_resource(show_spinner=False)
+def get_job_manager():
+    """Background metric jobs shared by all sessions; they survive reruns"""
+    return JobManager(max_workers=2)
+
+def job_owner():
+    """Id of this browser session for the shared JobManager"""
+    return st.session_state.setdefault('job_owner', uuid.uuid4().hex)
+
+@st.cache_resource(show_spinner=False)
+def get_baseline(size):
+    """Largest cached random-permutation baseline for this S-box size, or None"""
+    return find_baseline(size)
+
+def baseline_sidebar(profile):
+    """
+    Baseline for percentile ranking of `profile`, or None
+
+    When no artifact exists yet, the sidebar offers to build one as a
+    background job.
+    """
+    size = len(profile)
+    baseline = get_baseline(size)
+    if baseline is not None or profile.input_bits > 8 or not profile.is_bijective:
+        return baseline
+
+    manager = get_job_manager()
+    key = ('baseline', size)
+    future = manager.get(key)
+    if future is not None and future.done() and future.exception() is None:
+        get_baseline.clear()
+        return future.result()
+
+    st.sidebar.header('Random Baseline')
+    if future is not None and not future.done():
+        st.sidebar.info(f'⏳ Sampling {BASELINE_BUILD_COUNT:,} random permutations...')
+    else:
+        if future is not None:
+            st.sidebar.error(f'Baseline build failed: {future.exception()}')
+        st.sidebar.caption('Rank metrics against random permutations of the same size.')
+        if st.sidebar.button(f'Build baseline ({BASELINE_BUILD_COUNT:,} S-boxes)', key='build_baseline'):
+            # Forgets a failed build; a build another session started is re-attached to
+            manager.cancel(key)
+            # In-process: forking a worker pool from a Streamlit thread is unsafe
+            manager.submit(key, load_or_build_baseline, BASELINE_BUILD_COUNT, size, workers=1)
+            st.rerun()
+    return None
+
+def show_percentile(baseline, metric, value):
+    """Rank a metric value against the random-permutation baseline"""
+    if baseline is None:
+        return
+    percentile = baseline.percentile(metric, value)
+    st.caption(f'📊 better than {percentile:.1f}% of {baseline.count:,} random permutations')
+
+def compute_metric(metric, profile_hot, profile, store):
+    """
+    Compute one metric (runs as a background job)
+
+    Results from the persistent result store are reused unless the
+    computation is being profiled.
+
+    Returns:
+        tuple: (metric result, MetricTiming of the computation, or None if
+        the result came from the store)
+    """
+    store_name = STORE_NAMES[metric]
+    version = METRIC_VERSIONS[store_name]
+
+    if store is not None and not profile_hot:
+        stored = store.get(profile.store_key, store_name, version)
+        if stored is not None:
+            return stored, None
+
+    result, timing = instrumented_call(METRIC_FUNCTIONS[metric], profile, profile=profile_hot)
+    if store is not None:
+        store.put(profile.store_key, store_name, version, result)
+    return result, timing
+
+def submit_metric_jobs(metrics, digest, profile_hot, profile):
+    """
+    Start (or pick up) the background job of every selected metric
+
+    Job keys are kept in session state; metrics the user cancelled are not
+    restarted until they ask for it, and then re-attach to the job if it is
+    still running.
+
+    Returns:
+        dict: metric -> Future, or None for cancelled metrics
+    """
+    manager = get_job_manager()
+    store = get_result_store()
+    cancelled = st.session_state.setdefault('cancelled_jobs', set())
+
+    jobs = {}
+    for metric in metrics:
+        key = (digest, metric, profile_hot)
+        if key in cancelled:
+            jobs[metric] = None
+        else:
+            jobs[metric] = manager.submit(key, compute_metric, metric, profile_hot, profile, store,
+                                          owner=job_owner())
+
+    st.session_state.metric_jobs = {metric: (digest, metric, profile_hot) for metric in metrics}
+    return jobs
+
+def metric_outcome(jobs, metric, label):
+    """
+    Result of a metric job, or None while it is not available
+
+    Unfinished jobs show a placeholder with a cancel button, cancelled ones
+    a button to run them again.
+    """
+    key = st.session_state.metric_jobs[metric]
+    future = jobs[metric]
+
+    if future is None:
+        st.info(f'{label}: cancelled')
+        if st.button(f'Run {label} again', key=f'restart_{metric}'):
+            st.session_state.cancelled_jobs.discard(key)
+            st.rerun()
+        return None
+
+    if not future.done():
+        st.info(f'⏳ Computing {label}...')
+        if st.button(f'Cancel {label}', key=f'cancel_{metric}'):
+            get_job_manager().cancel(key, owner=job_owner())
+            st.session_state.cancelled_jobs.add(key)
+            st.rerun()
+        return None
+
+    error = future.exception()
+    if error is not None:
+        st.error(f'{label} failed: {error}')
+        return None
+    return future.result()
+
+def show_timing(label, timing, timings):
+    """Show a metric's cost under its value and keep it for the export"""
+    if timing is None:
+        st.caption('⏱ loaded from result store')
+        return
+    st.caption(f'⏱ {format_timing(timing)}')
+    if timing.profile:
+        with st.expander(f'cProfile: {label}'):
+            st.code(timing.profile)
+    timings[label] = timing
 
 def main():
     st.title('S-box Cryptographic Analysis')
@@ -20,24 +248,24 @@ def main():
     # Sidebar for file upload
     st.sidebar.header('Import S-box')
     uploaded_file = st.sidebar.file_uploader(
-        "Choose an Excel/CSV file", 
-        type=['xlsx', 'xls', 'csv']
+        "Choose an S-box file", 
+        type=[extension.lstrip('.') for extension in SBOX_EXTENSIONS]
     )
     
     # Evaluation options with unique keys
     evaluation_options = st.sidebar.multiselect(  
         'Select Evaluation Metrics',  
-        [  
-            'Linear Approximation Probability (LAP)',   
-            'Nonlinearity',   
-            'Strict Avalanche Criterion (SAC)',  
-            'Differential Approximation Probability (DAP)',  
-            'Bit Independence Criterion - SAC (BIC-SAC)',
-            'Bit Independence Criterion - Nonlinearity (BIC-NL)'
-        ],  
+        list(OPTION_METRICS),  
         default=[],  
         key='main_evaluation_metrics'  
     )  
+
+    # Opt-in cProfile dump of the hot functions of every metric
+    profile_hot = st.sidebar.checkbox(
+        'Profile metric computations (cProfile)',
+        value=False,
+        key='profile_metrics'
+    )
     
     # Initialize session state for S-box
     if 'sbox' not in st.session_state:
@@ -45,46 +273,59 @@ def main():
 
     # Check if a file is uploaded  
     if uploaded_file is None:  
-        st.info("Please upload an Excel or CSV file containing the S-box.")  
+        st.info("Please upload a file containing the S-box.")  
         st.markdown("""  
         ### S-box File Requirements:  
-        - File harus dalam format Excel (.xlsx, .xls) atau CSV  
-        - S-box harus berupa matriks persegi (sebaiknya 16x16 atau 256 elemen)  
+        - File dalam format Excel (.xlsx, .xls), CSV, NumPy (.npy), biner mentah (.bin, 1 byte per elemen) atau teks hex/array C (.hex, .txt, .h, .c)  
+        - File .bin/.npy/teks boleh berisi banyak S-box; pilih salah satu di sidebar  
+        - S-box berisi 2^n elemen (mis. 16x16 = 256 untuk 8-bit, 16 untuk 4-bit, 4096 untuk 12-bit)  
         - Semua nilai harus berupa bilangan bulat  
         - Tidak ada header atau kolom/baris tambahan  
         """)  
         return
     
     try:
-        # Read the uploaded file
-        if uploaded_file.name.endswith('.csv'):
-            df = pd.read_csv(uploaded_file, header=None)
-        else:
-            df = pd.read_excel(uploaded_file, header=None)
+        # Read the uploaded file (re-uploads of the same content hit the cache)
+        loaded = load_sbox(uploaded_file.getvalue(), uploaded_file.name)
+        sbox_index = 0
+        if len(loaded.sboxes) > 1:
+            sbox_index = st.sidebar.number_input(
+                f'S-box index (file holds {len(loaded.sboxes)})',
+                min_value=0, max_value=len(loaded.sboxes) - 1, value=0, step=1,
+                key=f'sbox_index_{uploaded_file.name}'
+            )
+        sbox = loaded.sboxes[sbox_index].tolist()
+        if not loaded.bijective[sbox_index]:
+            st.warning("S-box is not bijective (not a permutation of 0..2^n-1).")
         
-        # Flatten the dataframe to a 1D list and convert to integers
-        sbox = df.values.flatten().astype(int).tolist()
-        
-        # Validate and adjust S-box
-        if len(sbox) < 256:
-            st.warning(f"S-box size is {len(sbox)}. Padding to 256 elements.")
-        elif len(sbox) > 256:
-            st.warning(f"S-box size is {len(sbox)}. Truncating to 256 elements.")
+        # Validate and adjust S-box (2^n elements are used as an n-bit S-box)
+        if not is_power_of_two(len(sbox)):
+            if len(sbox) < 256:
+                st.warning(f"S-box size is {len(sbox)}. Padding to 256 elements.")
+            else:
+                st.warning(f"S-box size is {len(sbox)}. Truncating to 256 elements.")
         
         # Store S-box in session state
         st.session_state.sbox = sbox
+
+        # Validate once; derived tables are shared by all metrics below
+        profile = get_profile(sbox_digest(sbox), sbox)
+        digest = profile.digest
+        baseline = baseline_sidebar(profile)
         
         # Display S-box DataFrame  
         st.subheader('Imported S-box')  
-        # Reshape the sbox into a 16x16 grid  
-        sbox_grid = np.array(sbox).reshape(16, 16)  
+        # Reshape the sbox into a grid (16x16 for 8-bit S-boxes)  
+        rows, cols = grid_shape(len(profile))
+        sbox_grid = profile.values.reshape(rows, cols)  
         st.table(pd.DataFrame(sbox_grid,   
-                            columns=[f'{i+1}' for i in range(16)],   
-                            index=[f'{i+1}' for i in range(16)])  
+                            columns=[f'{i+1}' for i in range(cols)],   
+                            index=[f'{i+1}' for i in range(rows)])  
         )  
 
-        # Dictionary to store results for potential download  
+        # Dictionaries to store results and timings for potential download  
         sbox_results = {} 
+        timings = {}
         
         # Perform selected evaluations
         st.subheader('S-box Cryptographic Evaluation')
@@ -93,29 +334,47 @@ def main():
         if not evaluation_options:  
             st.warning("Please select at least one evaluation metric from the sidebar.")  
             return 
+
+        # Every metric runs as a background job; results fill in as they finish
+        jobs = submit_metric_jobs(
+            [OPTION_METRICS[option] for option in evaluation_options], digest, profile_hot, profile
+        )
+        finished = sum(future is not None and future.done() for future in jobs.values())
+        pending = sum(future is not None and not future.done() for future in jobs.values())
+        if pending:
+            st.progress(finished / len(jobs), text=f'{finished}/{len(jobs)} metrics computed')
         
         # Linear Approximation Probability
-        if 'Linear Approximation Probability (LAP)' in evaluation_options:
-            lap_value = linear_approximation_probability(sbox)
+        outcome = metric_outcome(jobs, 'lap', 'LAP') if 'Linear Approximation Probability (LAP)' in evaluation_options else None
+        if outcome:
+            lap_value, timing = outcome
             st.metric('Linear Approximation Probability (LAP)', f'{lap_value:.6f}')
+            show_percentile(baseline, 'lap', lap_value)
+            show_timing('LAP', timing, timings)
             sbox_results['lap'] = lap_value 
         
         # Nonlinearity
-        if 'Nonlinearity' in evaluation_options:
-            nonlinearity = compute_nonlinearity(sbox)
+        outcome = metric_outcome(jobs, 'nonlinearity', 'Nonlinearity') if 'Nonlinearity' in evaluation_options else None
+        if outcome:
+            nonlinearity, timing = outcome
             st.metric('Nonlinearity', str(nonlinearity))
+            show_percentile(baseline, 'nl', nonlinearity)
+            show_timing('Nonlinearity', timing, timings)
             sbox_results['nonlinearity'] = nonlinearity 
 
         # Strict Avalanche Criterion  
-        if 'Strict Avalanche Criterion (SAC)' in evaluation_options:  
-            sac_value, sac_matrix = strict_avalanche_criterion(sbox)  
+        outcome = metric_outcome(jobs, 'sac', 'SAC') if 'Strict Avalanche Criterion (SAC)' in evaluation_options else None
+        if outcome:
+            (sac_value, sac_matrix), timing = outcome
             st.metric('Strict Avalanche Criterion (SAC)', f'{sac_value:.10f}')
+            show_percentile(baseline, 'sac', sac_value)
+            show_timing('SAC', timing, timings)
         
-            # Menampilkan matriks SAC 8x8  
+            # Menampilkan matriks SAC n x m (8x8 untuk S-box 8-bit)  
             result_df = pd.DataFrame(  
                 sac_matrix,   
-                columns=[f'{i}' for i in range(8)],   
-                index=[f'{i}' for i in range(8)]  
+                columns=[f'{i}' for i in range(profile.output_bits)],   
+                index=[f'{i}' for i in range(profile.input_bits)]  
             )  
 
             st.write("SAC Matrix:")  
@@ -126,25 +385,129 @@ def main():
             sbox_results['sac_matrix'] = sac_matrix
         
         # Differential Approximation Probability  
-        if 'Differential Approximation Probability (DAP)' in evaluation_options:  
-            dap_value = calculate_dap(sbox)  
+        outcome = metric_outcome(jobs, 'dap', 'DAP') if 'Differential Approximation Probability (DAP)' in evaluation_options else None
+        if outcome:
+            dap_value, timing = outcome
             st.metric('Differential Approximation Probability (DAP)', f'{dap_value:.10f}')
+            show_percentile(baseline, 'dap', dap_value)
+            show_timing('DAP', timing, timings)
             sbox_results['dap'] = dap_value 
 
         # BIC-SAC  
-        if 'Bit Independence Criterion - SAC (BIC-SAC)' in evaluation_options:  
-            bic_sac_value = calculate_bic_sac(sbox)  
+        outcome = metric_outcome(jobs, 'bic_sac', 'BIC-SAC') if 'Bit Independence Criterion - SAC (BIC-SAC)' in evaluation_options else None
+        if outcome:
+            (bic_sac_value, bic_sac_matrix), timing = outcome
             st.metric('Bit Independence Criterion - SAC (BIC-SAC)', f'{bic_sac_value:.10f}')
+            show_percentile(baseline, 'bic_sac', bic_sac_value)
+            show_timing('BIC-SAC', timing, timings)
+
+            # One row per flipped input bit, one column per output bit pair
+            st.write("BIC-SAC Matrix (input bit x output bit pair):")
+            st.dataframe(pd.DataFrame(
+                bic_sac_matrix,
+                columns=[f'{j},{k}' for j, k in output_bit_pairs(profile.output_bits)],
+                index=[f'{i}' for i in range(profile.input_bits)]
+            ), use_container_width=True)
+
             sbox_results['bic_sac'] = bic_sac_value 
+            sbox_results['bic_sac_matrix'] = bic_sac_matrix
         
         # BIC-NL  
-        if 'Bit Independence Criterion - Nonlinearity (BIC-NL)' in evaluation_options:  
-            bic_nl_value = calculate_bic_nl(sbox)  
+        outcome = metric_outcome(jobs, 'bic_nl', 'BIC-NL') if 'Bit Independence Criterion - Nonlinearity (BIC-NL)' in evaluation_options else None
+        if outcome:
+            (bic_nl_value, bic_nl_matrix), timing = outcome
             st.metric('Bit Independence Criterion - Nonlinearity (BIC-NL)', str(bic_nl_value))
+            show_percentile(baseline, 'bic_nl', bic_nl_value)
+            show_timing('BIC-NL', timing, timings)
+
+            # Nonlinearity of every output bit pair XOR (m x m)
+            st.write("BIC-NL Matrix (output bit pairs):")
+            st.dataframe(pd.DataFrame(
+                bic_nl_matrix,
+                columns=[f'{i}' for i in range(profile.output_bits)],
+                index=[f'{i}' for i in range(profile.output_bits)]
+            ), use_container_width=True)
+
             sbox_results['bic_nl'] = bic_nl_value  
+            sbox_results['bic_nl_matrix'] = bic_nl_matrix
+
+        # Algebraic degree and ANF
+        outcome = metric_outcome(jobs, 'algebraic', 'Algebraic degree') if 'Algebraic Degree & ANF' in evaluation_options else None
+        if outcome:
+            algebraic, timing = outcome
+            degree_column, equations_column = st.columns(2)
+            degree_column.metric('Algebraic Degree (min / max over components)',
+                                 f"{algebraic['min_degree']} / {algebraic['max_degree']}")
+            equations_column.metric('Independent Quadratic Equations', str(algebraic['quadratic_equations']))
+            show_percentile(baseline, 'deg', algebraic['max_degree'])
+            show_timing('Algebraic', timing, timings)
+
+            # Degree and number of monomials of every coordinate function
+            st.write(f"ANF of coordinate functions (components: {algebraic['min_monomials']}"
+                     f"-{algebraic['max_monomials']} monomials):")
+            coordinates = [list(row) for row in zip(algebraic['coordinate_degrees'], algebraic['coordinate_monomials'])]
+            st.dataframe(pd.DataFrame(
+                coordinates,
+                columns=['Degree', 'Monomials'],
+                index=[f'bit {j}' for j in range(profile.output_bits)]
+            ), use_container_width=True)
+
+            st.write("Non-zero components per algebraic degree:")
+            st.dataframe(pd.DataFrame(
+                [algebraic['degree_distribution']],
+                columns=[f'{d}' for d in range(profile.input_bits + 1)],
+                index=['Components']
+            ), use_container_width=True)
+
+            sbox_results['algebraic'] = {
+                name: algebraic[name]
+                for name in ('min_degree', 'max_degree', 'min_monomials', 'max_monomials', 'quadratic_equations')
+            }
+            sbox_results['anf_coordinates'] = coordinates
+            sbox_results['degree_distribution'] = [algebraic['degree_distribution']]
+
+        # Autocorrelation indicators and linear structures
+        outcome = metric_outcome(jobs, 'autocorrelation', 'Autocorrelation') if 'Autocorrelation & Linear Structures' in evaluation_options else None
+        if outcome:
+            autocorrelation, timing = outcome
+            structures = [list(structure) for structure in autocorrelation['linear_structures']]
+            absolute_column, squares_column, structures_column = st.columns(3)
+            absolute_column.metric('Absolute Indicator', str(autocorrelation['absolute_indicator']))
+            squares_column.metric('Sum-of-Squares Indicator', str(autocorrelation['sum_of_squares_indicator']))
+            structures_column.metric('Linear Structures', str(len(structures)))
+            show_timing('Autocorrelation', timing, timings)
+
+            # (b, a, c) with b . (S(x) xor S(x xor a)) = c for every x
+            if structures:
+                st.write("Linear structures (output mask b, input difference a, constant c):")
+                if len(structures) > 1000:
+                    st.caption(f'Showing the first 1000 of {len(structures)}; all are included in the download.')
+                st.dataframe(pd.DataFrame(
+                    structures[:1000],
+                    columns=['Output mask b', 'Input difference a', 'Constant c']
+                ), use_container_width=True)
+                sbox_results['linear_structures'] = structures
+
+            sbox_results['autocorrelation'] = {
+                'absolute_indicator': autocorrelation['absolute_indicator'],
+                'sum_of_squares_indicator': autocorrelation['sum_of_squares_indicator'],
+                'linear_structures': len(structures),
+            }
         
-        # Add download button for all results  
-        add_download_buttons(sbox, evaluation_options, sbox_results)  
+        if pending:
+            # Poll until the remaining jobs finish; widget changes keep the jobs
+            st.caption('Download available once all metrics are computed.')
+            time.sleep(0.5)
+            st.rerun()
+
+        # Add download button for all results (export layer loaded on demand)  
+        from utils.create_result import add_download_buttons
+        add_download_buttons(profile.tolist(), evaluation_options, sbox_results, timings)  
+
+        if get_job_manager().status(('baseline', len(profile))) in ('pending', 'running'):
+            # Percentiles appear once the baseline build finishes
+            time.sleep(1)
+            st.rerun()
     
     except Exception as e:
         st.error(f"Error processing file: {str(e)}")
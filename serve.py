@@ -0,0 +1,56 @@
+import argparse
+import sys
+
+from utils.result_store import STORE_PATH_VARIABLE, ResultStore, configured_store_path
+from utils.service import MAX_INPUT_BITS, EvaluationService, create_server
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(
+        description='Serve S-box metric evaluation over HTTP (POST /evaluate, GET /stats).'
+    )
+    parser.add_argument('--host', default='127.0.0.1', help='Address to bind (default: 127.0.0.1)')
+    parser.add_argument('-p', '--port', type=int, default=8000, help='Port to bind (default: 8000)')
+    parser.add_argument('--max-batch', type=int, default=256,
+                        help='S-boxes per evaluation batch (default: 256)')
+    parser.add_argument('--max-delay-ms', type=float, default=5.0,
+                        help='Milliseconds a batch waits for concurrent requests (default: 5)')
+    parser.add_argument('--profile-cache', type=int, default=256,
+                        help='S-box profiles (derived tables) kept in memory (default: 256)')
+    parser.add_argument('--result-cache', type=int, default=1 << 16,
+                        help='Metric values kept in memory (default: 65536)')
+    parser.add_argument('--max-input-bits', type=int, default=MAX_INPUT_BITS,
+                        help=f'Reject S-boxes of more than 2^N entries (default: {MAX_INPUT_BITS})')
+    parser.add_argument('--store', metavar='PATH', default=configured_store_path(),
+                        help='SQLite result store to reuse and record results in '
+                             f'(default: ${STORE_PATH_VARIABLE}, else no store)')
+    parser.add_argument('--no-store', dest='store', action='store_const', const=None,
+                        help=f'Ignore ${STORE_PATH_VARIABLE}: do not read or write a store')
+    parser.add_argument('-q', '--quiet', action='store_true', help='Do not log requests')
+    return parser.parse_args(argv)
+
+def main(argv=None):
+    args = parse_args(argv)
+    store = ResultStore(args.store) if args.store else None
+    service = EvaluationService(args.max_batch, args.max_delay_ms / 1e3, args.profile_cache,
+                                args.result_cache, store, args.max_input_bits)
+    try:
+        server = create_server(service, args.host, args.port, args.quiet)
+    except OSError as e:
+        sys.exit(f'serve.py: error: {e}')
+
+    host, port = server.server_address[:2]
+    print(f'Serving S-box evaluation on http://{host}:{port}/ (Ctrl+C to stop)', file=sys.stderr)
+    if store is not None:
+        print(f'Result store: {store.path}', file=sys.stderr)
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+        service.close()
+        if store is not None:
+            store.close()
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,79 @@
+import argparse
+import sys
+import time
+
+import numpy as np
+
+from utils.loaders import load_sbox_file
+from utils.trails import PRESENT_PERMUTATION, PRESENT_SBOX, TRAIL_KINDS, best_trail_weights, layer_matrix
+
+def read_layer(spec, block_bits):
+    """
+    Linear layer from the command line
+
+    'present' selects the PRESENT bit permutation; a .npy file holds a
+    permutation (1-D) or a 0/1 matrix (2-D); a text file holds a
+    permutation on one line or one matrix row per line. The layer must
+    act on `block_bits` bits, otherwise ValueError is raised.
+    """
+    if spec == 'present':
+        layer = PRESENT_PERMUTATION
+    elif spec.lower().endswith('.npy'):
+        layer = np.load(spec)
+    else:
+        with open(spec) as f:
+            rows = [line.replace(',', ' ').split() for line in f if line.strip()]
+        if len(rows) == 1:
+            layer = [int(value) for value in rows[0]]
+        else:
+            # Matrix rows may be written as '0110...' or '0 1 1 0 ...'
+            layer = [[int(bit) for bit in (row[0] if len(row) == 1 else row)] for row in rows]
+            if len({len(row) for row in layer}) > 1:
+                raise ValueError(f'{spec}: matrix rows have different lengths')
+
+    try:
+        layer_matrix(layer, block_bits)
+    except ValueError as e:
+        raise ValueError(f'{spec}: {e} (state = S-box width x --num-sboxes = {block_bits} bits)') from None
+    return layer
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(
+        description='Bound the best differential/linear trails of an SPN built from an S-box.'
+    )
+    parser.add_argument('sbox', help="S-box file (first S-box is used) or 'present'")
+    parser.add_argument('-l', '--layer', default='present',
+                        help="Linear layer: 'present', a bit permutation or a 0/1 matrix file (default: present)")
+    parser.add_argument('-k', '--num-sboxes', type=int, default=16, help='S-boxes per round (default: 16)')
+    parser.add_argument('-r', '--rounds', type=int, default=5, help='Largest number of rounds (default: 5)')
+    parser.add_argument('--kind', choices=TRAIL_KINDS + ('both',), default='both',
+                        help='Trails to search (default: both)')
+    parser.add_argument('-w', '--workers', type=int, default=None,
+                        help='Worker processes for first-round branches (default: number of CPUs)')
+    return parser.parse_args(argv)
+
+def main(argv=None):
+    args = parse_args(argv)
+    try:
+        sbox = PRESENT_SBOX if args.sbox == 'present' else load_sbox_file(args.sbox).sboxes[0].tolist()
+        layer = read_layer(args.layer, (len(sbox).bit_length() - 1) * args.num_sboxes)
+    except (OSError, ValueError) as e:
+        sys.exit(f'trails.py: error: {e}')
+
+    kinds = TRAIL_KINDS if args.kind == 'both' else (args.kind,)
+    weights = {}
+    for kind in kinds:
+        start = time.perf_counter()
+        try:
+            weights[kind] = best_trail_weights(sbox, layer, args.num_sboxes, args.rounds, kind, args.workers)
+        except ValueError as e:
+            sys.exit(f'trails.py: error: {e}')
+        print(f'{kind} search: {time.perf_counter() - start:.2f}s', file=sys.stderr)
+
+    # -log2 of the best trail probability / squared correlation per round count
+    print('rounds,' + ','.join(kinds))
+    for rounds in range(1, args.rounds + 1):
+        print(f'{rounds},' + ','.join(f'{weights[kind][rounds - 1]:g}' for kind in kinds))
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,50 @@
+"""
+S-box cryptographic evaluation toolkit
+
+The compute core (S-box profile, metrics, screening, batch evaluation)
+depends only on NumPy and is cheap to import, e.g. for process pool workers
+and short CLI runs. The export (pandas/xlsxwriter) and Streamlit UI layers
+are only loaded on first access: `utils.export`, `utils.create_result`.
+"""
+import importlib
+
+from .sbox_profile import SboxProfile, as_profile, sbox_digest
+from .linear_approximation import linear_approximation_probability
+from .nonlinearity import compute_nonlinearity
+from .differential_uniformity import compute_differential_uniformity
+from .differential_approximation import calculate_dap
+from .boomerang_uniformity import compute_boomerang_uniformity
+from .avalanche_criterion import strict_avalanche_criterion, batch_strict_avalanche_criterion
+from .bit_independence import (
+    calculate_bic_sac,
+    calculate_bic_nl,
+    bit_independence_sac,
+    bit_independence_nonlinearity,
+)
+from .entropy import compute_entropy
+from .algebraic import (
+    algebraic_properties,
+    algebraic_degree,
+    batch_algebraic_degree,
+    quadratic_equation_count,
+)
+from .metrics import METRICS, resolve_metrics
+from .screening import screen_sbox
+from .equivalence import translation_canonical_form, canonical_digest, canonical_key, spectral_fingerprint
+from .autocorrelation import (
+    autocorrelation_table,
+    absolute_indicator,
+    sum_of_squares_indicator,
+    linear_structures,
+    autocorrelation_properties,
+    batch_autocorrelation,
+)
+from .trails import best_trail_weights
+
+# Heavy layers, imported on first attribute access
+_LAZY_MODULES = ('export', 'create_result')
+
+def __getattr__(name):
+    if name in _LAZY_MODULES:
+        return importlib.import_module(f'.{name}', __name__)
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
@@ -0,0 +1,241 @@
+from collections import namedtuple
+from itertools import combinations
+import numpy as np
+from .helpers import default_output_bits
+from .sbox_profile import as_profile
+
+# Bits set in every byte value, for counting monomials in packed ANF rows
+_POPCOUNT = np.array([bin(value).count('1') for value in range(256)], dtype=np.int64)
+
+# S-boxes per step in batch_algebraic_degree(), bounds the packed component tables
+_BATCH_ROWS = 256
+
+AlgebraicProperties = namedtuple('AlgebraicProperties', [
+    'min_degree',
+    'max_degree',
+    'degree_distribution',
+    'coordinate_degrees',
+    'coordinate_monomials',
+    'min_monomials',
+    'max_monomials',
+    'quadratic_equations',
+])
+AlgebraicProperties.__doc__ = """
+Result of algebraic_properties()
+
+- min_degree / max_degree: Algebraic degree over all non-zero components b.S
+- degree_distribution: Number of non-zero components of each degree 0..n
+- coordinate_degrees / coordinate_monomials: Degree and ANF size of every
+  output bit (LSB first)
+- min_monomials / max_monomials: ANF size over all non-zero components
+- quadratic_equations: Number of linearly independent equations of degree
+  <= 2 in the input and output bits that hold for every x (AES: 39)
+"""
+
+def moebius_transform(table):
+    """
+    Binary Moebius transform along the last axis (truth table <-> ANF)
+
+    Entry u of the result is the XOR of f(x) over all x whose bits are a
+    subset of u, i.e. the coefficient of the monomial x^u. The transform is
+    its own inverse.
+
+    Args:
+        table (array): 0/1 values, last axis of length 2^n
+
+    Returns:
+        np.ndarray: uint8 array of the same shape
+    """
+    anf = np.array(table, dtype=np.uint8)
+    size = anf.shape[-1]
+    lead = anf.shape[:-1]
+
+    h = 1
+    while h < size:
+        # Butterfly (a, b) -> (a, a xor b) on every block of width 2h
+        blocks = anf.reshape(*lead, size // (2 * h), 2, h)
+        blocks[..., 1, :] ^= blocks[..., 0, :]
+        h *= 2
+
+    return anf
+
+def coordinate_anf(sbox):
+    """
+    ANF of every coordinate function
+
+    Args:
+        sbox (list or SboxProfile): Input S-box
+
+    Returns:
+        np.ndarray: uint8 array (m, 2^n), row j holds the monomial
+        coefficients of output bit j (LSB first), column u the monomial x^u
+    """
+    return moebius_transform(as_profile(sbox).bit_planes)
+
+def monomial_degrees(input_bits):
+    """Degree (Hamming weight) of every monomial x^u, u = 0..2^n-1"""
+    weights = np.zeros(1 << input_bits, dtype=np.int64)
+    for bit in range(input_bits):
+        weights[1 << bit:2 << bit] = weights[:1 << bit] + 1
+    return weights
+
+def _component_anf(planes):
+    """
+    Packed ANF of all components of stacked S-boxes
+
+    The ANF is linear, so the ANF of b.S is the XOR of the coordinate ANFs
+    selected by b; components are built by doubling over the output bits.
+
+    Args:
+        planes (array): Bit planes (k, m, 2^n)
+
+    Returns:
+        np.ndarray: uint8 array (k, 2^m, ceil(2^n / 8)), monomial bits packed
+    """
+    packed = np.packbits(moebius_transform(planes), axis=-1)
+    num_sboxes, output_bits, width = packed.shape
+
+    components = np.zeros((num_sboxes, 1 << output_bits, width), dtype=np.uint8)
+    for bit in range(output_bits):
+        components[:, 1 << bit:2 << bit] = components[:, :1 << bit] ^ packed[:, bit, None]
+    return components
+
+def _component_degrees(components, input_bits):
+    """Degree of every packed component ANF (-1 for the zero function)"""
+    weights = monomial_degrees(input_bits)
+    degrees = np.full(components.shape[:-1], -1, dtype=np.int64)
+
+    for degree in range(input_bits + 1):
+        mask = np.packbits(weights == degree)
+        present = (components & mask).any(axis=-1)
+        degrees[present] = degree
+
+    return degrees
+
+def algebraic_properties(sbox):
+    """
+    Algebraic degree, ANF sizes and quadratic equation count of an S-box
+
+    The ANFs come from a Moebius transform of the bit planes, O(n 2^n) per
+    coordinate; component ANFs are XORs of coordinate ANFs on packed rows.
+
+    Args:
+        sbox (list or SboxProfile): Input S-box
+
+    Returns:
+        AlgebraicProperties
+    """
+    profile = as_profile(sbox)
+    input_bits = profile.input_bits
+
+    components = _component_anf(profile.bit_planes[None])[0]
+    degrees = _component_degrees(components, input_bits)[1:]
+    monomials = _POPCOUNT[components[1:]].sum(axis=-1)
+    coordinates = [(1 << bit) - 1 for bit in range(profile.output_bits)]
+
+    return AlgebraicProperties(
+        min_degree=int(degrees.min()),
+        max_degree=int(degrees.max()),
+        degree_distribution=np.bincount(np.maximum(degrees, 0), minlength=input_bits + 1).tolist(),
+        coordinate_degrees=degrees[coordinates].tolist(),
+        coordinate_monomials=monomials[coordinates].tolist(),
+        min_monomials=int(monomials.min()),
+        max_monomials=int(monomials.max()),
+        quadratic_equations=quadratic_equation_count(profile),
+    )
+
+def algebraic_degree(sbox):
+    """
+    Algebraic degree of an S-box (highest degree of any component)
+
+    Args:
+        sbox (list or SboxProfile): Input S-box
+
+    Returns:
+        int: Algebraic degree
+    """
+    anf = coordinate_anf(sbox)
+    weights = monomial_degrees(anf.shape[1].bit_length() - 1)
+    return int(weights[anf.any(axis=0)].max(initial=0))
+
+def batch_algebraic_degree(sboxes, output_bits=None):
+    """
+    Minimum and maximum component degree for a stack of S-boxes at once
+
+    Args:
+        sboxes (array): Shape (k, 2^n), one S-box per row
+        output_bits (int): Output width m, default_output_bits() of the
+            largest value when omitted
+
+    Returns:
+        tuple: (array of k minimum degrees, array of k maximum degrees)
+    """
+    values = np.asarray(sboxes, dtype=np.int64)
+    input_bits = values.shape[1].bit_length() - 1
+    if output_bits is None:
+        output_bits = default_output_bits(values.shape[1], values.max())
+
+    shifts = np.arange(output_bits)[:, None]
+    min_degrees = np.empty(len(values), dtype=np.int64)
+    max_degrees = np.empty(len(values), dtype=np.int64)
+
+    for start in range(0, len(values), _BATCH_ROWS):
+        block = values[start:start + _BATCH_ROWS]
+        planes = ((block[:, None, :] >> shifts) & 1).astype(np.uint8)
+        degrees = _component_degrees(_component_anf(planes), input_bits)[:, 1:]
+        min_degrees[start:start + len(block)] = degrees.min(axis=1)
+        max_degrees[start:start + len(block)] = degrees.max(axis=1)
+
+    return min_degrees, max_degrees
+
+def quadratic_equation_count(sbox):
+    """
+    Number of linearly independent quadratic equations of an S-box
+
+    Counts the independent GF(2) relations sum c_M M(x, y) = 0, over all
+    monomials M of degree <= 2 in the input bits x and output bits y, that
+    hold for every y = S(x): the number of monomials minus the rank of the
+    (monomial x input) evaluation matrix.
+
+    Args:
+        sbox (list or SboxProfile): Input S-box
+
+    Returns:
+        int: Number of independent equations (AES: 39)
+    """
+    profile = as_profile(sbox)
+    inputs = np.arange(len(profile))
+    input_planes = ((inputs[None, :] >> np.arange(profile.input_bits)[:, None]) & 1).astype(bool)
+    variables = np.concatenate([input_planes, profile.bit_planes.astype(bool)])
+
+    # One row per monomial 1, v_i, v_i v_j, evaluated at every input
+    first, second = zip(*combinations(range(len(variables)), 2)) if len(variables) > 1 else ((), ())
+    monomials = np.concatenate([
+        np.ones((1, len(inputs)), dtype=bool),
+        variables,
+        variables[list(first)] & variables[list(second)],
+    ])
+    return len(monomials) - _gf2_rank(monomials)
+
+def _gf2_rank(matrix):
+    """Rank of a boolean matrix over GF(2), by Gaussian elimination"""
+    rows = np.array(matrix, dtype=bool)
+    rank = 0
+
+    for column in range(rows.shape[1]):
+        candidates = np.flatnonzero(rows[rank:, column])
+        if not len(candidates):
+            continue
+        pivot = rank + candidates[0]
+        rows[[rank, pivot]] = rows[[pivot, rank]]
+
+        # Clear the column everywhere else
+        others = rows[:, column].copy()
+        others[rank] = False
+        rows[others] ^= rows[rank]
+
+        rank += 1
+        if rank == len(rows):
+            break
+
+    return rank
@@ -0,0 +1,149 @@
+from collections import namedtuple
+import numpy as np
+from .helpers import default_output_bits
+from .sbox_profile import as_profile
+from .walsh import batch_walsh_spectrum, autocorrelation_from_spectrum
+
+# S-boxes per step in batch_autocorrelation(), bounds the (k, 2^m, 2^n) tables
+_BATCH_ROWS = 16
+
+LinearStructure = namedtuple('LinearStructure', ['output_mask', 'input_difference', 'constant'])
+LinearStructure.__doc__ = """
+Linear structure of an S-box: b . (S(x) xor S(x xor a)) = c for every x
+
+- output_mask: Component b
+- input_difference: a
+- constant: c (0 or 1)
+"""
+
+AutocorrelationProperties = namedtuple('AutocorrelationProperties', [
+    'absolute_indicator',
+    'sum_of_squares_indicator',
+    'linear_structures',
+])
+AutocorrelationProperties.__doc__ = """
+Result of autocorrelation_properties()
+
+- absolute_indicator: max |r_b(a)| over non-zero b and a (AES: 32)
+- sum_of_squares_indicator: max over non-zero b of sum_a r_b(a)^2
+  (AES: 133120)
+- linear_structures: LinearStructure list, |r_b(a)| = 2^n
+"""
+
+def autocorrelation_table(sbox):
+    """
+    Autocorrelation Table of all component functions
+
+    r_b(a) = sum_x (-1)^(b . (S(x) xor S(x xor a))), computed from the
+    squared Walsh spectrum (see autocorrelation_from_spectrum).
+
+    Args:
+        sbox (list or SboxProfile): Input S-box
+
+    Returns:
+        np.ndarray: int64 array (2^m, 2^n) indexed by [output mask, input difference]
+    """
+    return as_profile(sbox).autocorrelation
+
+def absolute_indicator(sbox):
+    """
+    Absolute indicator: max |r_b(a)| over all non-zero b and a
+
+    Lower is better; 0 would mean every derivative is balanced.
+
+    Args:
+        sbox (list or SboxProfile): Input S-box
+
+    Returns:
+        int: Absolute indicator
+    """
+    return int(np.abs(autocorrelation_table(sbox)[1:, 1:]).max(initial=0))
+
+def sum_of_squares_indicator(sbox):
+    """
+    Sum-of-squares indicator: max over non-zero b of sum_a r_b(a)^2
+
+    Lower is better; the minimum 2^(2n) is reached by bent components.
+
+    Args:
+        sbox (list or SboxProfile): Input S-box
+
+    Returns:
+        int: Sum-of-squares indicator
+    """
+    table = autocorrelation_table(sbox)[1:]
+    return int((table ** 2).sum(axis=1).max(initial=0))
+
+def linear_structures(sbox):
+    """
+    All linear structures (b, a) with a constant derivative b . D_a S
+
+    Args:
+        sbox (list or SboxProfile): Input S-box
+
+    Returns:
+        list: LinearStructure tuples, ordered by output mask and input difference
+    """
+    profile = as_profile(sbox)
+    table = profile.autocorrelation
+    masks, differences = np.nonzero(np.abs(table[1:, 1:]) == len(profile))
+    return [
+        LinearStructure(int(b) + 1, int(a) + 1, int(table[b + 1, a + 1] < 0))
+        for b, a in zip(masks, differences)
+    ]
+
+def linear_structure_count(sbox):
+    """Number of linear structures (b, a), b and a non-zero (AES: 0)"""
+    profile = as_profile(sbox)
+    return int(np.count_nonzero(np.abs(profile.autocorrelation[1:, 1:]) == len(profile)))
+
+def autocorrelation_properties(sbox):
+    """
+    Absolute indicator, sum-of-squares indicator and linear structures
+
+    Args:
+        sbox (list or SboxProfile): Input S-box
+
+    Returns:
+        AutocorrelationProperties
+    """
+    profile = as_profile(sbox)
+    return AutocorrelationProperties(
+        absolute_indicator=absolute_indicator(profile),
+        sum_of_squares_indicator=sum_of_squares_indicator(profile),
+        linear_structures=linear_structures(profile),
+    )
+
+def batch_autocorrelation(sboxes, output_bits=None):
+    """
+    Autocorrelation indicators for a stack of S-boxes at once
+
+    Args:
+        sboxes (array): Shape (k, 2^n), one S-box per row
+        output_bits (int): Output width m, default_output_bits() of the
+            largest value when omitted
+
+    Returns:
+        tuple: (absolute indicators, sum-of-squares indicators, numbers of
+        linear structures), arrays of k values
+    """
+    values = np.asarray(sboxes, dtype=np.int64)
+    num_sboxes, num_inputs = values.shape
+    if output_bits is None:
+        output_bits = default_output_bits(num_inputs, values.max())
+
+    absolute = np.empty(num_sboxes, dtype=np.int64)
+    sum_of_squares = np.empty(num_sboxes, dtype=np.int64)
+    structures = np.empty(num_sboxes, dtype=np.int64)
+
+    for start in range(0, num_sboxes, _BATCH_ROWS):
+        block = values[start:start + _BATCH_ROWS]
+        rows = slice(start, start + len(block))
+        table = autocorrelation_from_spectrum(batch_walsh_spectrum(block, output_bits))[:, 1:]
+
+        magnitudes = np.abs(table[:, :, 1:])
+        absolute[rows] = magnitudes.max(axis=(1, 2))
+        sum_of_squares[rows] = (table ** 2).sum(axis=2).max(axis=1)
+        structures[rows] = np.count_nonzero(magnitudes == num_inputs, axis=(1, 2))
+
+    return absolute, sum_of_squares, structures
@@ -1,57 +1,70 @@
-def strict_avalanche_criterion(sbox):
-    return calculate_sac_value(sbox), calculate_sac_matrix(sbox)
+import numpy as np
+from .helpers import default_output_bits
+from .sbox_profile import as_profile
 
-def calculate_sac_value(sbox):
-    n = 8  # Panjang bit output S-Box
-    num_inputs = len(sbox)
-    total_flips = 0
-    total_bits = 0
+def strict_avalanche_criterion(sbox):
+    """
+    SAC value and n x m SAC matrix in a single pass
 
-    for input_val in range(num_inputs):  # Loop semua input S-Box (0-255)
-        original_output = binary_representation(sbox[input_val], n)
+    Both come from the per-bit flip counts of the cached avalanche tensor
+    S(x) xor S(x xor 2^i). Matrix columns follow binary_representation
+    (most significant output bit first).
 
-        for bit_to_flip in range(n):  # Flip setiap bit input (0-7)
-            flipped_input = input_val ^ (1 << bit_to_flip)
-            flipped_output = binary_representation(sbox[flipped_input], n)
+    Args:
+        sbox (list or SboxProfile): Input S-box
 
-            # Bandingkan output bit-by-bit
-            bit_flips = sum(
-                1 for orig_bit, flip_bit in zip(original_output, flipped_output)
-                if orig_bit != flip_bit
-            )
+    Returns:
+        tuple: (SAC value, SAC matrix as nested lists)
+    """
+    profile = as_profile(sbox)
+    flip_counts = _flip_counts(profile.avalanche_bits)
+    num_inputs = len(profile)
 
-            total_flips += bit_flips
-            total_bits += n  # Total bit yang dibandingkan adalah n (8) untuk setiap input
+    # Hitung nilai SAC (rata-rata) dan normalisasi matriks SAC (probabilitas)
+    sac_value = int(flip_counts.sum()) / (flip_counts.size * num_inputs)
+    sac_matrix = flip_counts / num_inputs
+    return sac_value, sac_matrix.tolist()
 
-    # Hitung nilai SAC (rata-rata)
-    sac_value = total_flips / total_bits
-    return sac_value
+def calculate_sac_value(sbox):
+    return strict_avalanche_criterion(sbox)[0]
 
 def calculate_sac_matrix(sbox):
-    n = 8  # Panjang bit output S-Box
-    num_inputs = len(sbox)
-    sac_matrix = [[0] * n for _ in range(n)]  # Matriks SAC 8x8
+    return strict_avalanche_criterion(sbox)[1]
 
-    for input_val in range(num_inputs):  # Loop semua input S-Box (0-255)
-        original_output = binary_representation(sbox[input_val], n)
+def batch_strict_avalanche_criterion(sboxes, output_bits=None):
+    """
+    SAC values and matrices for a stack of S-boxes at once
 
-        for bit_to_flip in range(n):  # Flip setiap bit input (0-7)
-            flipped_input = input_val ^ (1 << bit_to_flip)
-            flipped_output = binary_representation(sbox[flipped_input], n)
+    Args:
+        sboxes (array): Shape (k, 2^n), one S-box per row
+        output_bits (int): Output width m, default_output_bits() of the
+            largest value when omitted
 
-            # Bandingkan output bit-by-bit
-            for output_bit_index in range(n):
-                if original_output[output_bit_index] != flipped_output[output_bit_index]:
-                    sac_matrix[bit_to_flip][output_bit_index] += 1
+    Returns:
+        tuple: (array of k SAC values, array of shape (k, n, m) SAC matrices)
+    """
+    values = np.asarray(sboxes, dtype=np.int64)
+    num_inputs = values.shape[1]
+    input_bits = num_inputs.bit_length() - 1
+    if output_bits is None:
+        output_bits = default_output_bits(num_inputs, values.max())
 
-    # Normalisasi matriks SAC (bagi total input 256 agar hasil probabilitas)
-    for i in range(n):
-        for j in range(n):
-            sac_matrix[i][j] /= num_inputs
+    # derivatives[s, i, x] = S_s(x) xor S_s(x xor 2^i)
+    inputs = np.arange(num_inputs)
+    flips = 1 << np.arange(input_bits)[:, None]
+    derivatives = values[:, inputs[None, :]] ^ values[:, inputs[None, :] ^ flips]
 
-    return sac_matrix
+    shifts = np.arange(output_bits)
+    bits = ((derivatives[..., None] >> shifts) & 1).astype(bool)
+    flip_counts = _flip_counts(bits)
+
+    sac_values = flip_counts.sum(axis=(1, 2)) / (input_bits * output_bits * num_inputs)
+    return sac_values, flip_counts / num_inputs
+
+def _flip_counts(avalanche_bits):
+    """Count flips per (input bit, output bit), output bits MSB first"""
+    return np.count_nonzero(avalanche_bits, axis=-2)[..., ::-1]
 
 def binary_representation(num, width):  
     """Convert number to binary with a fixed width."""  
     return [int(x) for x in f"{num:0{width}b}"]  
-
@@ -0,0 +1,247 @@
+import glob
+import os
+from concurrent.futures import ProcessPoolExecutor
+import numpy as np
+from .walsh import batch_walsh_spectrum
+from .avalanche_criterion import batch_strict_avalanche_criterion
+from .algebraic import batch_algebraic_degree
+from .metrics import METRIC_VERSIONS
+from .result_store import default_store_path
+
+# Metrics sampled for the baseline, with what counts as better:
+# 'min' / 'max', or a target value (distance to it is minimized)
+BASELINE_METRICS = {
+    'lap': 'min',
+    'nl': 'max',
+    'sac': 0.5,
+    'dap': 'min',
+    'bic_sac': 0.5,
+    'bic_nl': 'max',
+    'du': 'min',
+    'deg': 'max',
+}
+
+# Metrics with integer values, as returned by utils.metrics
+_INTEGER_METRICS = {'nl', 'bic_nl', 'du', 'deg'}
+
+# S-boxes per vectorized step in batch_metrics(), bounds the (k, 2^n, 2^n) tables
+_SPECTRAL_ROWS = 16
+
+def default_baseline_path(count, size=256, seed=0):
+    """Cached artifact location, next to the result store"""
+    return os.path.join(os.path.dirname(default_store_path()), f'baseline-{size}-{count}-{seed}.npz')
+
+def random_permutations(count, size=256, seed=0):
+    """Array (count, size) of seeded random bijective S-boxes"""
+    rng = np.random.default_rng(seed)
+    dtype = np.uint8 if size <= 256 else np.uint16
+    return rng.permuted(np.tile(np.arange(size, dtype=dtype), (count, 1)), axis=1)
+
+def batch_metrics(sboxes, metrics=None):
+    """
+    BASELINE_METRICS of a stack of bijective S-boxes, vectorized over the stack
+
+    Gives the same values as the functions in utils.metrics. Walsh spectra
+    and DDTs are built for _SPECTRAL_ROWS S-boxes at a time, and only when a
+    requested metric needs them.
+
+    Args:
+        sboxes (array): Shape (k, 2^n), one permutation per row
+        metrics (list): Names from BASELINE_METRICS, None computes all
+
+    Returns:
+        dict: metric name -> array of k values
+    """
+    values = np.asarray(sboxes, dtype=np.int64)
+    num_sboxes, num_inputs = values.shape
+    bits = num_inputs.bit_length() - 1
+    names = [name for name in BASELINE_METRICS if metrics is None or name in metrics]
+    results = {
+        name: np.empty(num_sboxes, dtype=np.int64 if name in _INTEGER_METRICS else np.float64)
+        for name in names
+    }
+
+    if 'sac' in results:
+        results['sac'], _ = batch_strict_avalanche_criterion(values, bits)
+    if 'deg' in results:
+        _, results['deg'] = batch_algebraic_degree(values, bits)
+
+    spectral = not results.keys().isdisjoint({'lap', 'nl', 'bic_nl'})
+    differential = not results.keys().isdisjoint({'du', 'dap'})
+    uniformity = np.empty(num_sboxes, dtype=np.int64)
+    if not (spectral or differential or 'bic_sac' in results):
+        return results
+
+    inputs = np.arange(num_inputs)
+    shifts = np.arange(bits)
+    coordinates = 1 << shifts
+    first, second = np.triu_indices(bits, 1)
+    pairs = coordinates[first] | coordinates[second]
+
+    for start in range(0, num_sboxes, _SPECTRAL_ROWS):
+        block = values[start:start + _SPECTRAL_ROWS]
+        rows = slice(start, start + len(block))
+
+        if spectral:
+            spectrum = np.abs(batch_walsh_spectrum(block, bits)).astype(np.int64)
+
+            if 'lap' in results:
+                results['lap'][rows] = spectrum[:, 1:, 1:].max(axis=(1, 2)) / num_inputs / 2
+            if 'nl' in results:
+                results['nl'][rows] = num_inputs // 2 - spectrum[:, coordinates, 1:].max(axis=(1, 2)) // 2
+            if 'bic_nl' in results:
+                results['bic_nl'][rows] = (num_inputs // 2 - spectrum[:, pairs].max(axis=2) // 2).min(axis=1)
+
+        if differential:
+            # DDT rows a >= 1, one offset bincount per S-box block
+            output_diffs = block[:, None, :] ^ block[:, inputs[1:, None] ^ inputs]  # (k, 2^n - 1, 2^n)
+            offsets = np.arange(len(block) * (num_inputs - 1)).reshape(len(block), -1, 1) * num_inputs
+            counts = np.bincount((offsets + output_diffs).ravel(), minlength=offsets.size * num_inputs).reshape(len(block), -1)
+            uniformity[rows] = counts.max(axis=1)
+
+        if 'bic_sac' in results:
+            # Output bit pair flips for every input bit flip
+            flips = block[:, None, :] ^ block[:, inputs ^ coordinates[:, None]]  # (k, n, 2^n)
+            flip_bits = ((flips[..., None] >> shifts) & 1).astype(bool)
+            pair_flips = np.count_nonzero(flip_bits[..., first] ^ flip_bits[..., second], axis=2)
+            results['bic_sac'][rows] = pair_flips.sum(axis=(1, 2)) / (pair_flips[0].size * num_inputs)
+
+    if 'du' in results:
+        results['du'] = uniformity
+    if 'dap' in results:
+        results['dap'] = uniformity / num_inputs
+    return results
+
+def _sample_block(seed, count, size):
+    """Worker entry point: metrics of one seeded block of random permutations"""
+    return batch_metrics(random_permutations(count, size, seed))
+
+class Baseline:
+    """
+    Distribution of metric values over random permutations
+
+    Stored as exact value histograms (all metrics take few distinct
+    values), so an artifact of 100k samples is a few kilobytes.
+    """
+
+    def __init__(self, histograms, count, size, seed):
+        """
+        Args:
+            histograms (dict): metric -> (sorted values, counts)
+            count (int): Number of sampled S-boxes
+            size (int): S-box length 2^n
+            seed (int): Sampling seed
+        """
+        self.histograms = histograms
+        self.count = count
+        self.size = size
+        self.seed = seed
+
+    def percentile(self, metric, value):
+        """
+        Share of random permutations this value is better than, in percent
+
+        Ties count half, so the median random S-box scores about 50.
+        """
+        values, counts = self.histograms[metric]
+        goal = BASELINE_METRICS[metric]
+        if goal == 'max':
+            scores, score = values, value
+        elif goal == 'min':
+            scores, score = -values, -value
+        else:
+            scores, score = -np.abs(values - goal), -abs(value - goal)
+
+        worse = counts[scores < score].sum()
+        ties = counts[np.isclose(scores, score, rtol=0, atol=1e-12)].sum()
+        return 100.0 * (worse + ties / 2) / counts.sum()
+
+    def save(self, path):
+        """Write the histograms and metric versions to an .npz file"""
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        arrays = {'meta': np.array([self.count, self.size, self.seed])}
+        for metric, (values, counts) in self.histograms.items():
+            arrays[f'{metric}_values'] = values
+            arrays[f'{metric}_counts'] = counts
+            arrays[f'{metric}_version'] = np.array(METRIC_VERSIONS[metric])
+        with open(path, 'wb') as f:
+            np.savez_compressed(f, **arrays)
+
+    @classmethod
+    def load(cls, path):
+        """
+        Read an artifact written by save()
+
+        Returns:
+            Baseline, or None if it is missing or was built with another
+            version of any metric
+        """
+        if not os.path.exists(path):
+            return None
+        with np.load(path) as data:
+            count, size, seed = data['meta'].tolist()
+            histograms = {}
+            for metric in BASELINE_METRICS:
+                if f'{metric}_values' not in data or int(data[f'{metric}_version']) != METRIC_VERSIONS[metric]:
+                    return None
+                histograms[metric] = (data[f'{metric}_values'], data[f'{metric}_counts'])
+        return cls(histograms, count, size, seed)
+
+def build_baseline(count=100_000, size=256, seed=0, workers=None, block_size=1000):
+    """
+    Sample `count` random permutations and histogram their metrics
+
+    Blocks get independent seeds spawned from `seed`, so the result does not
+    depend on the number of workers.
+
+    Args:
+        count (int): Number of random S-boxes
+        size (int): S-box length 2^n
+        seed (int): Sampling seed
+        workers (int): Worker processes, None uses os.cpu_count()
+        block_size (int): S-boxes per worker task
+
+    Returns:
+        Baseline
+    """
+    block_sizes = [min(block_size, count - start) for start in range(0, count, block_size)]
+    seeds = np.random.SeedSequence(seed).spawn(len(block_sizes))
+    workers = workers or os.cpu_count() or 1
+
+    if workers == 1:
+        samples = list(map(_sample_block, seeds, block_sizes, [size] * len(block_sizes)))
+    else:
+        with ProcessPoolExecutor(max_workers=workers) as executor:
+            samples = list(executor.map(_sample_block, seeds, block_sizes, [size] * len(block_sizes)))
+
+    histograms = {}
+    for metric in BASELINE_METRICS:
+        values = np.concatenate([sample[metric] for sample in samples])
+        histograms[metric] = np.unique(values, return_counts=True)
+    return Baseline(histograms, count, size, seed)
+
+def load_or_build_baseline(count=100_000, size=256, seed=0, workers=None, path=None):
+    """Load the cached artifact, building and saving it first if needed"""
+    path = path or default_baseline_path(count, size, seed)
+    baseline = Baseline.load(path)
+    if baseline is None:
+        baseline = build_baseline(count, size, seed, workers)
+        baseline.save(path)
+    return baseline
+
+def find_baseline(size=256, directory=None):
+    """
+    Load the largest cached baseline for S-boxes of `size` entries
+
+    Returns:
+        Baseline, or None if no valid artifact exists
+    """
+    directory = directory or os.path.dirname(default_store_path())
+    paths = glob.glob(os.path.join(directory, f'baseline-{size}-*-*.npz'))
+    for path in sorted(paths, key=lambda path: int(os.path.basename(path).split('-')[2]), reverse=True):
+        baseline = Baseline.load(path)
+        if baseline is not None:
+            return baseline
+    return None
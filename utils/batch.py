@@ -0,0 +1,180 @@
+import csv
+import os
+import time
+from collections import namedtuple
+from itertools import repeat
+from concurrent.futures import ProcessPoolExecutor
+import numpy as np
+from .metrics import METRICS, METRIC_VERSIONS
+from .sbox_profile import SboxProfile
+from .screening import screen_sbox
+from .loaders import SBOX_EXTENSIONS, load_sbox_file, bijective_mask
+from .result_store import ResultStore
+from .equivalence import canonical_key
+
+LabeledSbox = namedtuple('LabeledSbox', ['label', 'sbox', 'bijective'])
+
+def read_sboxes(path, sbox_size=None, dtype=np.uint8):
+    """
+    Read many S-boxes from one input
+
+    Supported inputs:
+    - CSV file: one S-box per row
+    - NPY file: array of shape (k, 256), (k, 16, 16) or a single S-box
+      (1-D, or a 16x16 grid)
+    - BIN file: raw bytes, sbox_size (default 256) entries per S-box
+    - Hex/C-array text (.hex, .txt, .h, .c), see parse_sbox_text
+    - Directory: one file per S-box (or several for .bin/.npy/text files),
+      in name order
+
+    NPY and BIN files are memory-mapped; their S-boxes are zero-copy views
+    into the file, so large collections are not loaded up front.
+
+    Returns:
+        list: LabeledSbox tuples
+    """
+    if os.path.isdir(path):
+        sboxes = []
+        for name in sorted(os.listdir(path)):
+            file_path = os.path.join(path, name)
+            if os.path.isfile(file_path) and name.lower().endswith(SBOX_EXTENSIONS):
+                loaded = load_sbox_file(file_path, sbox_size, dtype)
+                single = len(loaded.sboxes) == 1
+                sboxes.extend(
+                    LabeledSbox(name if single else f'{name}:{i}', sbox, bool(bijective))
+                    for i, (sbox, bijective) in enumerate(zip(loaded.sboxes, loaded.bijective))
+                )
+        return sboxes
+
+    if not path.lower().endswith('.csv'):
+        loaded = load_sbox_file(path, sbox_size, dtype)
+        return [
+            LabeledSbox(f'{i}', sbox, bool(bijective))
+            for i, (sbox, bijective) in enumerate(zip(loaded.sboxes, loaded.bijective))
+        ]
+
+    with open(path, newline='') as f:
+        rows = [[int(cell) for cell in row if cell.strip()] for row in csv.reader(f) if any(cell.strip() for cell in row)]
+    if len({len(row) for row in rows}) == 1:
+        bijective = bijective_mask(np.array(rows))
+    else:
+        bijective = [sorted(row) == list(range(len(row))) for row in rows]
+    return [LabeledSbox(f'{i}', row, bool(flag)) for i, (row, flag) in enumerate(zip(rows, bijective))]
+
+def evaluate_sbox(sbox, metrics, bounds=None, store=None):
+    """
+    Evaluate the selected metrics on one S-box
+
+    With bounds (see screen_sbox), the S-box is screened first; rejected
+    S-boxes only get a 'rejected_by' entry and no metric values.
+
+    With a ResultStore, stored results of the current metric versions are
+    reused and newly computed ones are added to the store.
+
+    Returns:
+        tuple: (dict of metric results, dict of seconds spent per metric)
+    """
+    timings = {}
+    start = time.perf_counter()
+    profile = SboxProfile(sbox)
+    timings['validate'] = time.perf_counter() - start
+
+    results = {}
+    if bounds:
+        start = time.perf_counter()
+        screening = screen_sbox(profile, bounds)
+        timings['screen'] = time.perf_counter() - start
+
+        results['rejected_by'] = screening.rejected_by
+        if not screening.passed:
+            return results, timings
+
+    stored = {}
+    if store is not None:
+        start = time.perf_counter()
+        stored = store.get_many(profile.store_key, {name: METRIC_VERSIONS[name] for name in metrics})
+        timings['store'] = time.perf_counter() - start
+
+    computed = {}
+    for name in metrics:
+        if name in stored:
+            results[name] = stored[name]
+            continue
+        start = time.perf_counter()
+        results[name] = computed[name] = METRICS[name](profile)
+        timings[name] = time.perf_counter() - start
+
+    if store is not None and computed:
+        start = time.perf_counter()
+        store.put_many(profile.store_key, {name: (METRIC_VERSIONS[name], value) for name, value in computed.items()})
+        timings['store'] += time.perf_counter() - start
+
+    return results, timings
+
+# One ResultStore per worker process, opened on first use
+_worker_stores = {}
+
+def _evaluate_chunk(sboxes, metrics, bounds=None, store_path=None):
+    """Worker entry point: evaluate a list of S-boxes"""
+    store = None
+    if store_path:
+        store = _worker_stores.get(store_path)
+        if store is None:
+            store = _worker_stores[store_path] = ResultStore(store_path)
+    return [evaluate_sbox(sbox, metrics, bounds, store) for sbox in sboxes]
+
+def _chunks(items, size):
+    for start in range(0, len(items), size):
+        yield items[start:start + size]
+
+def evaluate_batch(sboxes, metrics, workers=None, chunk_size=64, bounds=None, store_path=None, dedup=False):
+    """
+    Evaluate many S-boxes, in parallel when workers > 1
+
+    Args:
+        sboxes (list): S-boxes as lists of ints
+        metrics (list): Metric names from METRICS
+        workers (int): Worker processes, None uses os.cpu_count()
+        chunk_size (int): S-boxes sent to a worker per task
+        bounds (dict): Optional screening bounds, see screen_sbox
+        store_path (str): Optional ResultStore database consulted before
+            computing and updated afterwards
+        dedup (bool): Evaluate only the first S-box of every translation
+            class and output width (see canonical_key) and copy its results
+            to the others
+
+    Yields:
+        tuple: (results, timings) per S-box, in input order; copied results
+        have empty timings
+    """
+    if not dedup:
+        yield from _evaluate_all(sboxes, metrics, workers, chunk_size, bounds, store_path)
+        return
+
+    keys = [canonical_key(sbox) for sbox in sboxes]
+    first_member = {}
+    representatives = [sbox for index, (sbox, key) in enumerate(zip(sboxes, keys)) if first_member.setdefault(key, index) == index]
+
+    # Representatives come back in input order, before any later member of their class
+    evaluated = _evaluate_all(representatives, metrics, workers, chunk_size, bounds, store_path)
+    class_results = {}
+    for index, key in enumerate(keys):
+        if first_member[key] == index:
+            results, timings = next(evaluated)
+            class_results[key] = results
+            yield results, timings
+        else:
+            yield dict(class_results[key]), {}
+
+def _evaluate_all(sboxes, metrics, workers, chunk_size, bounds, store_path):
+    workers = workers or os.cpu_count() or 1
+    chunks = _chunks(sboxes, chunk_size)
+
+    if workers == 1:
+        for chunk in chunks:
+            yield from _evaluate_chunk(chunk, metrics, bounds, store_path)
+        return
+
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        for chunk_results in executor.map(_evaluate_chunk, chunks, repeat(metrics), repeat(bounds), repeat(store_path)):
+            yield from chunk_results
@@ -1,72 +1,100 @@
 import numpy as np
-from itertools import product
-from .helpers import to_bit_vector, hamming_weight, validate_and_pad_sbox
+from .sbox_profile import as_profile
+from .walsh import fast_walsh_hadamard, spectrum_dtype
 
 def calculate_bic_sac(sbox):  
     """  
     Calculate the Bit Independence Criterion - Strict Avalanche Criterion (BIC-SAC)  
     
     Args:  
-        sbox (list): Input S-box  
+        sbox (list or SboxProfile): Input S-box  
     
     Returns:  
         float: BIC-SAC value  
     """  
-    # Validate and pad S-box
-    sbox = validate_and_pad_sbox(sbox)
-    
-    n = len(sbox)  
-    total_bits = len(format(n - 1, 'b'))  # Bit length (8 for GF(2^8))  
-    bic_sac_values = []  
+    return bit_independence_sac(sbox)[0]
+
+def bit_independence_sac(sbox):  
+    """  
+    BIC-SAC value and per (input bit, output pair) matrix  
 
-    # Loop for each output bit pair  
-    for i in range(total_bits):  # Input bit to flip  
-        for j1 in range(total_bits):  # First output bit  
-            for j2 in range(total_bits):  # Second output bit  
-                if j1 != j2:  # Only for different output bits  
-                    diff_count = 0  
-                    for x in range(n):  
-                        flipped_x = x ^ (1 << i)  # Flip the i-th input bit  
-                        bit_j1 = (sbox[x] >> j1) & 1  # j1 bit of original output  
-                        bit_j2 = (sbox[x] >> j2) & 1  # j2 bit of original output  
-                        flipped_bit_j1 = (sbox[flipped_x] >> j1) & 1  # j1 bit of flipped output  
-                        flipped_bit_j2 = (sbox[flipped_x] >> j2) & 1  # j2 bit of flipped output  
-                        diff_count += (bit_j1 ^ flipped_bit_j1) ^ (bit_j2 ^ flipped_bit_j2)  # XOR differences  
-                    bic_sac_values.append(diff_count / n)  # Normalize for bit pair  
+    Entry [i][p] is the probability that output bits j xor k flip when input
+    bit i flips, for the p-th pair j < k. All entries come from one
+    reduction over the (n, 2^n, m) avalanche bit tensor.
     
-    return sum(bic_sac_values) / len(bic_sac_values)  # Average of all bit pairs  
+    Args:  
+        sbox (list or SboxProfile): Input S-box  
+    
+    Returns:  
+        tuple: (BIC-SAC value, n x m(m-1)/2 matrix), pairs ordered as in
+        output_bit_pairs()  
+    """  
+    profile = as_profile(sbox)
+    
+    m = profile.output_bits  
+    if m < 2:
+        raise ValueError("BIC-SAC needs at least 2 output bits")
+
+    first, second = np.triu_indices(m, 1)
+    bits = profile.avalanche_bits  # bits[i, x, j] = bit j of S(x) xor S(x xor 2^i)
+    pair_flips = np.count_nonzero(bits[:, :, first] ^ bits[:, :, second], axis=1)
+
+    num_inputs = len(profile)
+    bic_sac_matrix = pair_flips / num_inputs  # Normalize for bit pair  
+    bic_sac_value = pair_flips.sum() / (pair_flips.size * num_inputs)  # Average of all bit pairs  
+
+    return float(bic_sac_value), bic_sac_matrix.tolist()
+
+def output_bit_pairs(output_bits):
+    """Output bit pairs (j, k), j < k, in the column order used by BIC matrices"""
+    first, second = np.triu_indices(output_bits, 1)
+    return list(zip(first.tolist(), second.tolist()))
 
 def calculate_bic_nl(sbox):  
     """  
     Calculate the Bit Independence Criterion - Nonlinearity (BIC-NL)  
     
     Args:  
-        sbox (list): Input S-box  
+        sbox (list or SboxProfile): Input S-box  
     
     Returns:  
-        int: Minimum distance from affine functions  
+        int: Minimum nonlinearity over all output bit pair XORs  
     """  
-    # Validate and pad S-box
-    sbox = validate_and_pad_sbox(sbox)
-    
-    n = 8  # Input length  
-    m = 8  # Output length  
-    min_distance = float("inf")  
+    return bit_independence_nonlinearity(sbox)[0]
 
-    # Convert S-box to boolean function table  
-    truth_table = np.array([to_bit_vector(sbox[x]) for x in range(256)])  
+def bit_independence_nonlinearity(sbox):  
+    """  
+    BIC-NL value and per-pair matrix  
+
+    For every pair of output bits j < k the function f_j xor f_k is formed
+    from the bit-plane matrix; the nonlinearity of all pairs comes from one
+    batched Walsh transform: NL = 2^(n-1) - max_a |W(a)| / 2.
+    
+    Args:  
+        sbox (list or SboxProfile): Input S-box  
+    
+    Returns:  
+        tuple: (minimum BIC-NL, m x m symmetric matrix of pair nonlinearities,
+        diagonal set to 0)  
+    """  
+    profile = as_profile(sbox)
+    
+    m = profile.output_bits  # Output length  
+    if m < 2:
+        raise ValueError("BIC-NL needs at least 2 output bits")
 
-    # Create all affine functions  
-    affine_masks = list(product([0, 1], repeat=n))  
+    # Truth tables of all m(m-1)/2 output bit pair XORs (28 for 8-bit)
+    first, second = np.triu_indices(m, 1)
+    planes = profile.bit_planes
+    pair_signs = 1 - 2 * (planes[first] ^ planes[second]).astype(np.int8)
 
-    for mask in affine_masks:  
-        mask = np.array(mask)  
-        for const in [0, 1]:  
-            affine_output = np.array([hamming_weight(mask & to_bit_vector(x)) % 2 ^ const for x in range(256)])  
-            for bit in range(m):  # For each output bit of boolean function  
-                f_bit = truth_table[:, bit]  
-                distance = 256 - np.sum(f_bit == affine_output)  
-                min_distance = min(min_distance, distance)  
+    num_inputs = len(profile)
+    spectrum = fast_walsh_hadamard(pair_signs, spectrum_dtype(num_inputs))
+    max_bias = np.abs(spectrum).max(axis=1).astype(np.int64)  # Includes a = 0 (constant functions)
+    pair_nl = num_inputs // 2 - max_bias // 2
 
-    return min_distance  
+    bic_nl_matrix = np.zeros((m, m), dtype=np.int64)
+    bic_nl_matrix[first, second] = pair_nl
+    bic_nl_matrix[second, first] = pair_nl
 
+    return int(pair_nl.min()), bic_nl_matrix.tolist()
@@ -0,0 +1,14 @@
+from .sbox_profile import as_profile
+
+def compute_boomerang_uniformity(sbox):
+    """
+    Compute the boomerang uniformity of the S-Box (list or SboxProfile)
+
+    Returns None for S-boxes that are not permutations, which have no BCT.
+    """
+    profile = as_profile(sbox)
+    if not profile.is_bijective:
+        return None
+
+    # Row a = 0 and column b = 0 are trivially 2^n
+    return int(profile.bct[1:, 1:].max())
@@ -1,55 +1,19 @@
-
 import streamlit as st
-import pandas as pd
-import numpy as np
-import io
-import re
-
-def sanitize_sheet_name(name, max_length=31):
-    """
-    Sanitize sheet name to be Excel-compatible
-    
-    Parameters:
-    - name: Original sheet name
-    - max_length: Maximum allowed length (default 31)
-    
-    Returns:
-    - Sanitized sheet name
-    """
-    # Remove special characters
-    sanitized = re.sub(r'[^\w\s-]', '', name)
-    
-    # Replace spaces with underscores
-    sanitized = sanitized.replace(' ', '_')
-    
-    # Truncate to max length
-    return sanitized[:max_length]
+from .export import (  # Re-exported for existing callers
+    sanitize_sheet_name,
+    create_sbox_table,
+    create_timings_table,
+    build_export_tables,
+    excel_bytes,
+    export_results,
+    results_digest,
+    EXPORT_FORMATS,
+)
 
-def create_sbox_table(sbox):
-    """
-    Convert 1D S-box to 16x16 DataFrame
-    
-    Parameters:
-    - sbox: 1D list of S-box values
-    
-    Returns:
-    - DataFrame representing 16x16 S-box table
-    """
-    # Ensure the S-box is exactly 256 elements
-    if len(sbox) != 256:
-        raise ValueError("S-box must contain exactly 256 elements")
-    
-    # Reshape into 16x16 grid
-    sbox_grid = np.array(sbox).reshape(16, 16)
-    
-    # Create DataFrame with labeled rows and columns
-    sbox_df = pd.DataFrame(
-        sbox_grid, 
-        columns=[f'{i+1}' for i in range(16)],
-        index=[f'{i+1}' for i in range(16)]
-    )
-    
-    return sbox_df
+@st.cache_data(max_entries=32, show_spinner=False)
+def _cached_export(results_key, fmt, _sbox, _evaluation_results, _timings):
+    """Build an export once per (result hash, format)"""
+    return export_results(_sbox, _evaluation_results, fmt, _timings)
 
 def create_downloadable_excel(data, sheet_name='Sheet1', filename='sbox_evaluation.xlsx'):
     """
@@ -63,88 +27,38 @@ def create_downloadable_excel(data, sheet_name='Sheet1', filename='sbox_evaluati
     Returns:
     - Streamlit download button
     """
-    # Create a buffer to store the Excel file
-    buffer = io.BytesIO()
-    
-    # Handle different input types
     try:
-        with pd.ExcelWriter(buffer, engine='xlsxwriter') as writer:
-            if isinstance(data, dict):
-                # Multiple sheets in a workbook
-                for sheet, df in data.items():
-                    # Sanitize sheet name
-                    safe_sheet_name = sanitize_sheet_name(str(sheet))
-                    
-                    # Convert to DataFrame if not already
-                    if not isinstance(df, pd.DataFrame):
-                        df = pd.DataFrame(df)
-                    
-                    # Write to Excel with sanitized sheet name
-                    df.to_excel(writer, sheet_name=safe_sheet_name, index=True)
-            
-            elif isinstance(data, pd.DataFrame):
-                # Single DataFrame
-                data.to_excel(writer, sheet_name=sanitize_sheet_name(sheet_name), index=True)
-            
-            elif isinstance(data, (list, np.ndarray)):
-                # Convert list or array to DataFrame
-                df = pd.DataFrame(data)
-                df.to_excel(writer, sheet_name=sanitize_sheet_name(sheet_name), index=True)
-            
-            else:
-                st.error("Unsupported data type for Excel conversion")
-                return None
-    
+        workbook = excel_bytes(data, sheet_name)
+    except TypeError as e:
+        st.error(str(e))
+        return None
     except Exception as e:
         st.error(f"Error creating Excel file: {e}")
         return None
-
-    # Seek to the beginning of the buffer
-    buffer.seek(0)
     
     # Create Streamlit download button
     return st.download_button(
         label="Download Evaluation Results (Excel)",
-        data=buffer,
+        data=workbook,
         file_name=filename,
         mime="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet"
     )
 
-def prepare_sbox_evaluation_download(sbox, evaluation_results):
+def prepare_sbox_evaluation_download(sbox, evaluation_results, timings=None):
     """
     Prepare a comprehensive Excel file with S-box evaluation results
     
     Parameters:
     - sbox: The S-box list
     - evaluation_results: Dictionary of evaluation metrics and their results
+    - timings: Optional dictionary of metric name -> MetricTiming, written
+      to a "Timings" sheet
     
     Returns:
     - Downloadable Excel file with multiple sheets
     """
     # Prepare data for Excel export
-    export_data = {
-        'SBox_16x16_Table': create_sbox_table(sbox),
-    }
-    
-    # Add evaluation results to export data
-    for metric, value in evaluation_results.items():
-        if metric == 'S-box':
-            continue  # Skip duplicate S-box sheet
-        
-        if isinstance(value, (int, float)):
-            # Scalar values
-            export_data[f'{metric}_Value'] = pd.DataFrame([value], columns=['Value'])
-        elif isinstance(value, (list, np.ndarray)):
-            # Matrices or lists
-            export_data[f'{metric}_Matrix'] = pd.DataFrame(
-                value, 
-                columns=[f'{i+1}' for i in range(len(value[0]))],
-                index=[f'{i+1}' for i in range(len(value))]
-            )
-        elif isinstance(value, dict):
-            # For more complex results
-            for sub_metric, sub_value in value.items():
-                export_data[f"{metric}_{sub_metric}"] = pd.DataFrame([sub_value], columns=['Value'])
+    export_data = build_export_tables(sbox, evaluation_results, timings)
     
     # Create downloadable Excel
     return create_downloadable_excel(
@@ -152,14 +66,18 @@ def prepare_sbox_evaluation_download(sbox, evaluation_results):
         filename='sbox_cryptographic_evaluation.xlsx'
     )
 
-def add_download_buttons(sbox, evaluation_options, sbox_results):
+def add_download_buttons(sbox, evaluation_options, sbox_results, timings=None):
     """
     Add download buttons for S-box evaluation results
     
+    The export is only built after "Prepare download" is clicked, and is
+    cached by result hash and format, so reruns do not rebuild it.
+    
     Parameters:
     - sbox: The S-box list
     - evaluation_options: List of selected evaluation metrics
     - sbox_results: Dictionary to store evaluation results
+    - timings: Optional dictionary of metric name -> MetricTiming
     """
     # Prepare results for download
     download_results = {}
@@ -180,10 +98,44 @@ def add_download_buttons(sbox, evaluation_options, sbox_results):
     
     if 'Bit Independence Criterion - SAC (BIC-SAC)' in evaluation_options:
         download_results['BIC_SAC'] = sbox_results.get('bic_sac', None)
+        download_results['BIC_SAC_Matrix'] = sbox_results.get('bic_sac_matrix', None)
     
     if 'Bit Independence Criterion - Nonlinearity (BIC-NL)' in evaluation_options:
         download_results['BIC_NL'] = sbox_results.get('bic_nl', None)
+        download_results['BIC_NL_Matrix'] = sbox_results.get('bic_nl_matrix', None)
+    
+    if 'Algebraic Degree & ANF' in evaluation_options:
+        download_results['Algebraic'] = sbox_results.get('algebraic', None)
+        download_results['ANF_Coordinates'] = sbox_results.get('anf_coordinates', None)
+        download_results['Degree_Distribution'] = sbox_results.get('degree_distribution', None)
+    
+    if 'Autocorrelation & Linear Structures' in evaluation_options:
+        download_results['Autocorrelation'] = sbox_results.get('autocorrelation', None)
+        download_results['Linear_Structures'] = sbox_results.get('linear_structures', None)
+    
+    fmt = st.selectbox('Export format', list(EXPORT_FORMATS), key='export_format')
+    results_key = results_digest(sbox, download_results)
+    
+    if st.button('Prepare download', key='prepare_export'):
+        st.session_state.export_ready = (results_key, fmt)
+    
+    # Only build the file for the results and format that were requested
+    if st.session_state.get('export_ready') != (results_key, fmt):
+        return None
+    
+    try:
+        data = _cached_export(results_key, fmt, sbox, download_results, timings)
+    except Exception as e:
+        st.error(f"Error creating {fmt} file: {e}")
+        return None
+    
+    extension, mime = EXPORT_FORMATS[fmt]
     
     # Create download button
-    return prepare_sbox_evaluation_download(sbox, download_results)
+    return st.download_button(
+        label=f"Download Evaluation Results ({fmt})",
+        data=data,
+        file_name=f'sbox_cryptographic_evaluation.{extension}',
+        mime=mime
+    )
 
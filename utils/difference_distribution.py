@@ -0,0 +1,34 @@
+import numpy as np
+
+# Number of (input diff, x) pairs handled per bincount for large S-boxes
+_BLOCK_ENTRIES = 1 << 20
+
+def difference_distribution_table(sbox, output_bits=8):
+    """
+    Difference Distribution Table: #{x : S(x) xor S(x xor a) = b}
+
+    Args:
+        sbox (list): Input S-box of length 2^n
+        output_bits (int): Output width m of the S-box
+
+    Returns:
+        np.ndarray: Array of shape (2^n, 2^m) indexed by [input diff, output diff]
+    """
+    values = np.asarray(sbox, dtype=np.int64)
+    num_inputs = len(values)
+    num_outputs = 1 << output_bits
+    inputs = np.arange(num_inputs)
+
+    ddt = np.empty((num_inputs, num_outputs), dtype=np.int64)
+    rows_per_block = max(1, _BLOCK_ENTRIES // num_inputs)
+
+    for start in range(0, num_inputs, rows_per_block):
+        input_diffs = np.arange(start, min(start + rows_per_block, num_inputs))[:, None]
+        output_diffs = values[inputs[None, :]] ^ values[inputs[None, :] ^ input_diffs]
+
+        # One bincount for all rows: offset every row into its own block of 2^m bins
+        offsets = (input_diffs - start) * num_outputs
+        counts = np.bincount((offsets + output_diffs).ravel(), minlength=len(input_diffs) * num_outputs)
+        ddt[start:start + len(input_diffs)] = counts.reshape(len(input_diffs), num_outputs)
+
+    return ddt
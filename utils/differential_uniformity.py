@@ -1,25 +1,11 @@
-from .helpers import validate_and_pad_sbox
+from .sbox_profile import as_profile
 
 def compute_differential_uniformity(sbox):
     """
-    Compute the differential uniformity of the S-Box
+    Compute the differential uniformity of the S-Box (list or SboxProfile)
     """
-    # Validate and pad S-box
-    sbox = validate_and_pad_sbox(sbox)
-    num_inputs = len(sbox)
-    max_diff_count = 0
-
-    for input_diff in range(1, num_inputs):
-        for output_diff in range(num_inputs):
-            diff_count = 0
-            for x in range(num_inputs):
-                y1 = sbox[x]
-                y2 = sbox[x ^ input_diff]
-                
-                if y1 ^ y2 == output_diff:
-                    diff_count += 1
-            
-            max_diff_count = max(max_diff_count, diff_count)
+    ddt = as_profile(sbox).ddt
 
+    # Input difference 0 is trivial (all pairs map to output difference 0)
+    max_diff_count = int(ddt[1:].max())
     return max_diff_count
-
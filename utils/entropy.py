@@ -1,9 +1,13 @@
 import numpy as np
+from .sbox_profile import SboxProfile
 
 def compute_entropy(sbox):  
     """  
-    Compute the entropy of the S-box  
+    Compute the entropy of the S-box (list or SboxProfile)  
     """  
+    if isinstance(sbox, SboxProfile):
+        sbox = sbox.values
+
     # Count frequency of each value  
     unique, counts = np.unique(sbox, return_counts=True)  
     probabilities = counts / len(sbox)  
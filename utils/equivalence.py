@@ -0,0 +1,92 @@
+import hashlib
+import numpy as np
+from .sbox_profile import as_profile, sbox_digest
+
+def translation_canonical_form(sbox):
+    """
+    Canonical representative of the class {x -> S(x xor c) xor d}
+
+    Input and output translations change neither the DDT, the BCT nor any
+    |Walsh| value, and only permute the avalanche derivatives, so every
+    metric in utils.metrics (and SAC/BIC matrices) is the same for the whole
+    class at a fixed output width m (see canonical_key). The representative is the lexicographically smallest
+    S(x xor c) xor S(c) over all c, i.e. translated so that S'(0) = 0.
+
+    Args:
+        sbox (list or SboxProfile): Input S-box
+
+    Returns:
+        np.ndarray: Canonical S-box, same dtype as the profile values
+    """
+    values = as_profile(sbox).values
+    inputs = np.arange(len(values))
+
+    # Row c: S(x xor c) xor S(c)
+    candidates = values[inputs[None, :] ^ inputs[:, None]] ^ values[:, None]
+
+    # Lexicographic minimum: keep the rows holding the smallest entry, column by column
+    for column in range(1, len(values)):
+        column_values = candidates[:, column]
+        candidates = candidates[column_values == column_values.min()]
+        if len(candidates) == 1:
+            break
+
+    return candidates[0]
+
+def canonical_digest(sbox):
+    """SHA-256 of translation_canonical_form(), equal for all translates of an S-box"""
+    return sbox_digest(translation_canonical_form(sbox))
+
+def canonical_key(sbox):
+    """
+    canonical_digest() plus the output width m, like SboxProfile.store_key
+
+    Translates can differ in their inferred width (S and S xor 0x80 when
+    all S(x) < 128), and SAC and BIC depend on it, so only S-boxes with the
+    same key may share results.
+    """
+    profile = as_profile(sbox)
+    return f'{canonical_digest(profile)}/{profile.output_bits}'
+
+def spectral_fingerprint(sbox):
+    """
+    Affine-equivalence invariant hash of the DDT and |Walsh| spectra
+
+    A2(S(A1(x))) permutes DDT and Walsh rows and columns, so the multiset of
+    (sorted) rows of both tables is an invariant. Different fingerprints
+    prove two S-boxes inequivalent; equal fingerprints do not prove
+    equivalence.
+
+    Note that nonlinearity (coordinates only), SAC and BIC as computed here
+    are not affine invariant, so metrics must not be shared on this basis;
+    use canonical_digest() for that.
+
+    Args:
+        sbox (list or SboxProfile): Input S-box
+
+    Returns:
+        str: SHA-256 hex digest
+    """
+    profile = as_profile(sbox)
+    digest = hashlib.sha256()
+    for table in (profile.ddt, np.abs(profile.walsh_spectrum)):
+        rows = np.sort(table, axis=1)
+        rows = rows[np.lexsort(rows.T[::-1])]
+        digest.update(rows.astype('<i4').tobytes())
+    return digest.hexdigest()
+
+def group_equivalent(sboxes, key=canonical_digest):
+    """
+    Group S-boxes by an equivalence key
+
+    Args:
+        sboxes (list): S-boxes (lists, arrays or SboxProfiles)
+        key (callable): canonical_digest or spectral_fingerprint
+
+    Returns:
+        dict: key -> list of indices into sboxes, in input order
+    """
+    groups = {}
+    for index, sbox in enumerate(sboxes):
+        groups.setdefault(key(sbox), []).append(index)
+    return groups
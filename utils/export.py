@@ -0,0 +1,269 @@
+import hashlib
+import io
+import json
+import re
+import numpy as np
+import pandas as pd
+from .helpers import grid_shape, is_power_of_two
+
+# Export format -> (file extension, MIME type)
+EXPORT_FORMATS = {
+    'Excel': ('xlsx', 'application/vnd.openxmlformats-officedocument.spreadsheetml.sheet'),
+    'CSV': ('csv', 'text/csv'),
+    'JSON': ('json', 'application/json'),
+    'NPZ': ('npz', 'application/octet-stream'),
+    'Parquet': ('parquet', 'application/vnd.apache.parquet'),
+}
+
+def sanitize_sheet_name(name, max_length=31):
+    """
+    Sanitize sheet name to be Excel-compatible
+    
+    Parameters:
+    - name: Original sheet name
+    - max_length: Maximum allowed length (default 31)
+    
+    Returns:
+    - Sanitized sheet name
+    """
+    # Remove special characters
+    sanitized = re.sub(r'[^\w\s-]', '', name)
+    
+    # Replace spaces with underscores
+    sanitized = sanitized.replace(' ', '_')
+    
+    # Truncate to max length
+    return sanitized[:max_length]
+
+def create_sbox_table(sbox):
+    """
+    Convert 1D S-box to a grid DataFrame (16x16 for 8-bit S-boxes)
+    
+    Parameters:
+    - sbox: 1D list of S-box values (2^n elements)
+    
+    Returns:
+    - DataFrame representing the S-box table
+    """
+    # Ensure the S-box has 2^n elements
+    if not is_power_of_two(len(sbox)):
+        raise ValueError("S-box must contain 2^n elements")
+    
+    # Reshape into grid
+    rows, cols = grid_shape(len(sbox))
+    sbox_grid = np.array(sbox).reshape(rows, cols)
+    
+    # Create DataFrame with labeled rows and columns
+    sbox_df = pd.DataFrame(
+        sbox_grid, 
+        columns=[f'{i+1}' for i in range(cols)],
+        index=[f'{i+1}' for i in range(rows)]
+    )
+    
+    return sbox_df
+
+def create_timings_table(timings):
+    """
+    Convert metric timings to a DataFrame
+    
+    Parameters:
+    - timings: Dictionary of metric name -> MetricTiming
+    
+    Returns:
+    - DataFrame with wall time, CPU time and peak memory per metric
+    """
+    return pd.DataFrame(
+        [
+            {
+                'Wall (ms)': timing.wall_seconds * 1e3,
+                'CPU (ms)': timing.cpu_seconds * 1e3,
+                'Peak memory (KiB)': timing.peak_bytes / 1024,
+            }
+            for timing in timings.values()
+        ],
+        index=list(timings)
+    )
+
+def build_export_tables(sbox, evaluation_results, timings=None):
+    """
+    Collect the S-box and its evaluation results as export tables
+    
+    Parameters:
+    - sbox: The S-box list
+    - evaluation_results: Dictionary of evaluation metrics and their results
+    - timings: Optional dictionary of metric name -> MetricTiming, exported
+      as a "Timings" table
+    
+    Returns:
+    - Dictionary of table name -> DataFrame
+    """
+    export_data = {
+        'SBox_Table': create_sbox_table(sbox),
+    }
+    
+    # Add evaluation results to export data
+    for metric, value in evaluation_results.items():
+        if metric == 'S-box':
+            continue  # Skip duplicate S-box sheet
+        
+        if isinstance(value, (int, float)):
+            # Scalar values
+            export_data[f'{metric}_Value'] = pd.DataFrame([value], columns=['Value'])
+        elif isinstance(value, (list, np.ndarray)):
+            # Matrices or lists
+            export_data[f'{metric}_Matrix'] = pd.DataFrame(
+                value, 
+                columns=[f'{i+1}' for i in range(len(value[0]))],
+                index=[f'{i+1}' for i in range(len(value))]
+            )
+        elif isinstance(value, dict):
+            # For more complex results
+            for sub_metric, sub_value in value.items():
+                export_data[f"{metric}_{sub_metric}"] = pd.DataFrame([sub_value], columns=['Value'])
+    
+    if timings:
+        export_data['Timings'] = create_timings_table(timings)
+
+    return export_data
+
+def excel_bytes(data, sheet_name='Sheet1'):
+    """
+    Write tables to an in-memory Excel workbook
+    
+    Parameters:
+    - data: Can be a dictionary of DataFrames, a single DataFrame, or a list/array
+    - sheet_name: Name of the sheet if single DataFrame
+    
+    Returns:
+    - Workbook content as bytes
+    """
+    # Create a buffer to store the Excel file
+    buffer = io.BytesIO()
+    
+    with pd.ExcelWriter(buffer, engine='xlsxwriter') as writer:
+        if isinstance(data, dict):
+            # Multiple sheets in a workbook
+            for sheet, df in data.items():
+                # Sanitize sheet name
+                safe_sheet_name = sanitize_sheet_name(str(sheet))
+                
+                # Convert to DataFrame if not already
+                if not isinstance(df, pd.DataFrame):
+                    df = pd.DataFrame(df)
+                
+                # Write to Excel with sanitized sheet name
+                df.to_excel(writer, sheet_name=safe_sheet_name, index=True)
+        
+        elif isinstance(data, pd.DataFrame):
+            # Single DataFrame
+            data.to_excel(writer, sheet_name=sanitize_sheet_name(sheet_name), index=True)
+        
+        elif isinstance(data, (list, np.ndarray)):
+            # Convert list or array to DataFrame
+            df = pd.DataFrame(data)
+            df.to_excel(writer, sheet_name=sanitize_sheet_name(sheet_name), index=True)
+        
+        else:
+            raise TypeError("Unsupported data type for Excel conversion")
+
+    return buffer.getvalue()
+
+def results_digest(sbox, evaluation_results):
+    """
+    Content hash of an S-box and its results, used to cache exports
+    
+    Returns:
+    - SHA-256 hex digest
+    """
+    payload = json.dumps(
+        {'sbox': list(sbox), 'results': evaluation_results},
+        sort_keys=True, default=_json_default
+    )
+    return hashlib.sha256(payload.encode()).hexdigest()
+
+def _json_default(value):
+    """Make NumPy values and MetricTiming tuples JSON serializable"""
+    if isinstance(value, np.ndarray):
+        return value.tolist()
+    if isinstance(value, np.generic):
+        return value.item()
+    if hasattr(value, '_asdict'):
+        return value._asdict()
+    raise TypeError(f"Object of type {type(value).__name__} is not JSON serializable")
+
+def results_long_table(sbox, evaluation_results, timings=None):
+    """
+    All results as one long table with columns metric, row, column, value
+    
+    Scalars have empty row/column, matrices one row per cell, and the S-box
+    itself is listed as metric 'S-box' with row = input.
+    
+    Returns:
+    - List of (metric, row, column, value) tuples
+    """
+    rows = [('S-box', x, None, int(y)) for x, y in enumerate(sbox)]
+    
+    for metric, value in evaluation_results.items():
+        if value is None:
+            continue
+        if isinstance(value, dict):
+            rows.extend((f'{metric}_{key}', None, None, float(item)) for key, item in value.items())
+        elif np.ndim(value) == 0:
+            rows.append((metric, None, None, float(value)))
+        else:
+            for (i, j), item in np.ndenumerate(np.asarray(value, dtype=float)):
+                rows.append((metric, i, j, item))
+    
+    for metric, timing in (timings or {}).items():
+        rows.append((f'{metric}_wall_ms', None, None, timing.wall_seconds * 1e3))
+        rows.append((f'{metric}_cpu_ms', None, None, timing.cpu_seconds * 1e3))
+        rows.append((f'{metric}_peak_kib', None, None, timing.peak_bytes / 1024))
+    
+    return rows
+
+def export_results(sbox, evaluation_results, fmt, timings=None):
+    """
+    Serialize an S-box evaluation in one of EXPORT_FORMATS
+    
+    Parameters:
+    - sbox: The S-box list
+    - evaluation_results: Dictionary of evaluation metrics and their results
+    - fmt: Key of EXPORT_FORMATS
+    - timings: Optional dictionary of metric name -> MetricTiming
+    
+    Returns:
+    - File content as bytes
+    """
+    if fmt == 'Excel':
+        return excel_bytes(build_export_tables(sbox, evaluation_results, timings))
+    
+    if fmt == 'JSON':
+        document = {'sbox': list(sbox), 'results': evaluation_results, 'timings': timings or {}}
+        return json.dumps(document, indent=2, default=_json_default).encode()
+    
+    if fmt == 'NPZ':
+        arrays = {'sbox': np.asarray(sbox)}
+        for metric, value in evaluation_results.items():
+            if value is not None and not isinstance(value, dict):
+                arrays[sanitize_sheet_name(metric)] = np.asarray(value)
+        if timings:
+            arrays['timing_metrics'] = np.array(list(timings))
+            arrays['timings'] = np.array([[t.wall_seconds, t.cpu_seconds, t.peak_bytes] for t in timings.values()])
+        buffer = io.BytesIO()
+        np.savez_compressed(buffer, **arrays)
+        return buffer.getvalue()
+    
+    table = pd.DataFrame(
+        results_long_table(sbox, evaluation_results, timings),
+        columns=['metric', 'row', 'column', 'value']
+    ).astype({'row': 'Int64', 'column': 'Int64'})
+    
+    if fmt == 'CSV':
+        return table.to_csv(index=False).encode()
+    
+    if fmt == 'Parquet':
+        buffer = io.BytesIO()
+        table.to_parquet(buffer, index=False)  # Requires pyarrow
+        return buffer.getvalue()
+    
+    raise ValueError(f"Unknown export format '{fmt}'. Available: {', '.join(EXPORT_FORMATS)}")
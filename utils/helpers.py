@@ -14,7 +14,11 @@ def hamming_weight(vec):
 
 def validate_and_pad_sbox(sbox):
     """
-    Validate and pad/truncate S-box to 256 elements
+    Validate an S-box and pad/truncate it to a power-of-two length
+
+    S-boxes whose length is already a power of two (16 for 4-bit, 64 for
+    6-bit, 4096 for 12-bit, ...) are kept as they are. Any other length is
+    padded/truncated to 256 elements, as for 8-bit S-boxes.
     
     Args:
         sbox (list): Input S-box
@@ -22,6 +26,12 @@ def validate_and_pad_sbox(sbox):
     Returns:
         list: Validated and padded/truncated S-box
     """
+    if any(value < 0 or value >= 1 << 16 for value in sbox):
+        raise ValueError("S-box values must be integers between 0 and 65535")
+
+    if is_power_of_two(len(sbox)):
+        return sbox
+
     # Ensure the S-box is padded to 256 elements if needed
     if len(sbox) < 256:
         # Pad with sequential values if the S-box is smaller
@@ -32,3 +42,36 @@ def validate_and_pad_sbox(sbox):
     
     return sbox
 
+def is_power_of_two(value):
+    """Check whether value is 2^k for some k >= 1"""
+    return value >= 2 and value & (value - 1) == 0
+
+def grid_shape(num_entries):
+    """
+    Display grid for an S-box with 2^n entries (16x16 for 8-bit)
+
+    Returns:
+        tuple: (rows, columns), rows = 2^ceil(n/2), columns = 2^floor(n/2)
+    """
+    bits = num_entries.bit_length() - 1
+    return 1 << (bits - bits // 2), 1 << (bits // 2)
+
+def default_output_bits(num_entries, largest):
+    """
+    Output width m assumed for an S-box whose output width is not given
+
+    The bits the largest value needs, except that 8-bit S-boxes (256
+    entries) are always at least 8 bits wide: a non-bijective 8-bit S-box
+    whose values happen to stay below 128 is still an 8x8 S-box, and SAC
+    and BIC-SAC depend on m. Smaller tables keep the inferred width (e.g. 4
+    for a DES-style 6x4 S-box).
+
+    Args:
+        num_entries (int): S-box length 2^n
+        largest (int): Largest S-box value
+
+    Returns:
+        int: Output width m
+    """
+    required_bits = max(1, int(largest).bit_length())
+    return max(required_bits, 8) if num_entries == 256 else required_bits
@@ -0,0 +1,154 @@
+import numpy as np
+from .sbox_profile import as_profile
+from .walsh import component_signs
+
+class SwapEvaluator:
+    """
+    Mutable S-box evaluation state for swap-based search
+
+    Holds the DDT, the Walsh spectrum of all components and the avalanche
+    flip counts of an S-box, and updates them when two entries are swapped
+    instead of recomputing everything:
+
+    - DDT: only pairs (x, x xor a) with x in {i, j, i xor a, j xor a} change,
+      one entry per row and swapped input, O(2^n) work
+    - Walsh spectrum: the change is the rank-1 product
+      ((-1)^(b.S(j)) - (-1)^(b.S(i))) * ((-1)^(a.i) - (-1)^(a.j)), one
+      vectorized outer-product add from precomputed sign tables. A quarter
+      of all 2^m x 2^n entries change on every swap, so this step is
+      O(2^(m+n)) (O(4^n) for n x n S-boxes), not O(2^n); it still avoids
+      the O(2^m * n 2^n) transform of a full recomputation
+    - Avalanche: only derivatives at x in {i, j, i xor 2^k, j xor 2^k} change,
+      O(n) work
+
+    Every swap is recorded, so a candidate move can be scored and reverted
+    with undo().
+    """
+
+    def __init__(self, sbox):
+        profile = as_profile(sbox)
+
+        self.input_bits = profile.input_bits
+        self.output_bits = profile.output_bits
+        self.values = profile.values.astype(np.int64)
+
+        # Private copies: the profile's cached tables must stay untouched
+        self.ddt = profile.ddt.copy()
+        self.walsh = profile.walsh_spectrum.copy()
+        self.derivatives = profile.avalanche.astype(np.int64)
+        self._flip_counts = np.count_nonzero(profile.avalanche_bits, axis=1)  # (n, m), LSB first
+
+        num_inputs = len(self.values)
+        self._inputs = np.arange(num_inputs)
+        # (-1)^(a.x) and (-1)^(b.y) for all masks, as rows indexed by x / y
+        # (same dtype as the spectrum, so updates need no casting)
+        self._input_signs = component_signs(self._inputs, self.input_bits).T.astype(self.walsh.dtype)
+        self._output_signs = component_signs(np.arange(1 << self.output_bits), self.output_bits).T.astype(self.walsh.dtype)
+        self._input_flips = 1 << np.arange(self.input_bits)
+        self._output_shifts = np.arange(self.output_bits)
+        self._history = []
+
+    def __len__(self):
+        return len(self.values)
+
+    def tolist(self):
+        """Return the current S-box as a plain list of ints"""
+        return self.values.tolist()
+
+    def swap(self, i, j):
+        """Swap S(i) and S(j) and update all tables"""
+        self._swap(i, j)
+        self._history.append((i, j))
+
+    def undo(self):
+        """Revert the most recent swap"""
+        if not self._history:
+            raise IndexError("No swap to undo")
+        i, j = self._history.pop()
+        self._swap(i, j)  # A swap is its own inverse
+
+    @property
+    def history(self):
+        """Swaps applied so far, oldest first"""
+        return list(self._history)
+
+    def _swap(self, i, j):
+        if i == j:
+            return
+
+        y_i, y_j = self.values[i], self.values[j]
+
+        # Remove old contributions, swap, then add the new ones
+        self._update_ddt(i, j, -1)
+        self._update_avalanche(i, j, -1)
+
+        self.values[i], self.values[j] = y_j, y_i
+
+        self._update_ddt(i, j, 1)
+        self._update_avalanche(i, j, 1)
+        self._update_walsh(i, j, y_i, y_j)
+
+    def _update_ddt(self, i, j, sign):
+        # For every a, x = i and x = i xor a give the same output difference,
+        # so each row gets exactly one entry per swapped input (no collisions)
+        pair = np.array([i, j])
+        output_diffs = self.values[pair, None] ^ self.values[pair[:, None] ^ self._inputs]
+
+        # For a = i xor j both pairs are the same pair {i, j}
+        weight_j = np.full(len(self._inputs), 2 * sign)
+        weight_j[i ^ j] = 0
+
+        self.ddt[self._inputs, output_diffs[0]] += 2 * sign
+        self.ddt[self._inputs, output_diffs[1]] += weight_j
+
+    def _update_avalanche(self, i, j, sign):
+        # S(x) xor S(x xor 2^k) is shared by x = i and x = i xor 2^k
+        pair = np.array([i, j])
+        flips = self._input_flips
+        derivatives = self.values[pair, None] ^ self.values[pair[:, None] ^ flips]  # (2, n)
+
+        # Flipping input bit k of i gives j: both are the same pair {i, j}
+        weight = np.full(derivatives.shape, 2)
+        weight[1, (i ^ j) == flips] = 0
+
+        flipped = (derivatives[..., None] >> self._output_shifts) & 1  # (2, n, m)
+        self._flip_counts += sign * np.einsum('pk,pkj->kj', weight, flipped)
+
+        if sign > 0:
+            bits = np.arange(self.input_bits)
+            self.derivatives[bits, pair[:, None]] = derivatives
+            self.derivatives[bits, pair[:, None] ^ flips] = derivatives
+
+    def _update_walsh(self, i, j, y_i, y_j):
+        # Non-zero only where b.S(i) != b.S(j) and a.i != a.j, a quarter of
+        # the table; the dense add is faster than scattering into that
+        # quarter with fancy indexing (about 7x for 8-bit S-boxes)
+        output_change = self._output_signs[y_j] - self._output_signs[y_i]
+        input_change = self._input_signs[i] - self._input_signs[j]
+        self.walsh += np.multiply.outer(output_change, input_change)
+
+    def differential_uniformity(self):
+        """Current differential uniformity"""
+        return int(self.ddt[1:].max())
+
+    def dap(self):
+        """Current Differential Approximation Probability"""
+        return self.differential_uniformity() / len(self.values)
+
+    def nonlinearity(self):
+        """Current nonlinearity (coordinate functions, as compute_nonlinearity)"""
+        coordinate_masks = [1 << output_bit for output_bit in range(self.output_bits)]
+        max_bias = int(np.abs(self.walsh[coordinate_masks, 1:]).max())
+        return (1 << (self.input_bits - 1)) - max_bias // 2
+
+    def lap(self):
+        """Current Linear Approximation Probability"""
+        max_bias = int(np.abs(self.walsh[1:, 1:]).max())
+        return max_bias / len(self.values) / 2
+
+    def sac(self):
+        """Current SAC value and matrix (as strict_avalanche_criterion)"""
+        num_inputs = len(self.values)
+        sac_value = int(self._flip_counts.sum()) / (self._flip_counts.size * num_inputs)
+        sac_matrix = self._flip_counts[:, ::-1] / num_inputs
+        return sac_value, sac_matrix.tolist()
@@ -0,0 +1,84 @@
+import cProfile
+import io
+import pstats
+import threading
+import time
+import tracemalloc
+from collections import namedtuple
+
+MetricTiming = namedtuple('MetricTiming', ['wall_seconds', 'cpu_seconds', 'peak_bytes', 'profile'])
+MetricTiming.__doc__ = """
+Cost of one metric computation
+
+- wall_seconds / cpu_seconds: elapsed and CPU time of the calling thread
+- peak_bytes: peak memory allocated by Python/NumPy during the call (an
+  upper bound when other instrumented calls run concurrently)
+- profile: cProfile statistics of the hottest functions, or None
+"""
+
+# Calls may overlap (e.g. background jobs): tracing is started by the first
+# active call and stopped by the last one
+_tracing_lock = threading.Lock()
+_active_calls = 0
+_started_tracing = False
+
+def _begin_tracing():
+    global _active_calls, _started_tracing
+    with _tracing_lock:
+        if _active_calls == 0:
+            _started_tracing = not tracemalloc.is_tracing()
+            if _started_tracing:
+                tracemalloc.start()
+            else:
+                tracemalloc.reset_peak()
+        _active_calls += 1
+
+def _end_tracing():
+    """Peak traced bytes since tracing (re)started"""
+    global _active_calls
+    with _tracing_lock:
+        _, peak_bytes = tracemalloc.get_traced_memory()
+        _active_calls -= 1
+        if _active_calls == 0 and _started_tracing:
+            tracemalloc.stop()
+    return peak_bytes
+
+def instrumented_call(function, *args, profile=False, profile_lines=15, **kwargs):
+    """
+    Call function(*args, **kwargs) and measure its cost
+
+    Args:
+        function: Metric function to call
+        profile (bool): Also capture a cProfile dump of the hot functions
+        profile_lines (int): Number of functions kept in the dump
+
+    Returns:
+        tuple: (function result, MetricTiming)
+    """
+    _begin_tracing()
+    profiler = cProfile.Profile() if profile else None
+    wall_start = time.perf_counter()
+    cpu_start = time.thread_time()
+    try:
+        if profiler:
+            result = profiler.runcall(function, *args, **kwargs)
+        else:
+            result = function(*args, **kwargs)
+    finally:
+        cpu_seconds = time.thread_time() - cpu_start
+        wall_seconds = time.perf_counter() - wall_start
+        peak_bytes = _end_tracing()
+
+    stats_text = None
+    if profiler:
+        buffer = io.StringIO()
+        pstats.Stats(profiler, stream=buffer).sort_stats('cumulative').print_stats(profile_lines)
+        stats_text = buffer.getvalue()
+
+    return result, MetricTiming(wall_seconds, cpu_seconds, peak_bytes, stats_text)
+
+def format_timing(timing):
+    """Short human readable summary, e.g. '12.3 ms wall, 12.1 ms CPU, peak 512.0 KiB'"""
+    return (f'{timing.wall_seconds * 1e3:.1f} ms wall, '
+            f'{timing.cpu_seconds * 1e3:.1f} ms CPU, '
+            f'peak {timing.peak_bytes / 1024:.1f} KiB')
@@ -0,0 +1,103 @@
+import threading
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+
+class JobManager:
+    """
+    Keyed background jobs on a thread pool
+
+    Submitting a key that is already pending, running or finished returns
+    the existing future, so callers that re-run from the top (e.g. a
+    Streamlit script on every widget change) pick up their jobs instead of
+    restarting them. Finished jobs are kept as a small LRU cache of results.
+
+    Jobs can be shared by several owners (e.g. Streamlit sessions looking at
+    the same S-box); cancel() only detaches its caller and stops the job
+    once nobody else is waiting for it.
+
+    NumPy releases the GIL inside its kernels, so metric jobs overlap well on
+    threads and share the in-memory S-box profiles.
+    """
+
+    def __init__(self, max_workers=2, max_finished=256):
+        """
+        Args:
+            max_workers (int): Worker threads
+            max_finished (int): Finished jobs kept before the oldest are dropped
+        """
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix='metric-job')
+        self._jobs = OrderedDict()
+        self._owners = {}
+        self._lock = threading.Lock()
+        self._max_finished = max_finished
+
+    def submit(self, key, function, *args, owner=None, **kwargs):
+        """
+        Start function(*args, **kwargs) as job `key`, unless it already exists
+
+        `owner` identifies the caller for cancel(); the existing job, also a
+        running one another owner cancelled, is re-attached to.
+        """
+        with self._lock:
+            future = self._jobs.get(key)
+            if future is None or future.cancelled():
+                future = self._executor.submit(function, *args, **kwargs)
+                self._jobs[key] = future
+                self._owners[key] = set()
+                self._drop_finished()
+            self._jobs.move_to_end(key)
+            self._owners[key].add(owner)
+            return future
+
+    def get(self, key):
+        """Future of job `key`, or None"""
+        with self._lock:
+            return self._jobs.get(key)
+
+    def status(self, key):
+        """'missing', 'pending', 'running', 'cancelled', 'failed' or 'done'"""
+        future = self.get(key)
+        if future is None:
+            return 'missing'
+        if future.cancelled():
+            return 'cancelled'
+        if future.running():
+            return 'running'
+        if not future.done():
+            return 'pending'
+        return 'failed' if future.exception() is not None else 'done'
+
+    def cancel(self, key, owner=None):
+        """
+        Cancel job `key` for `owner`
+
+        The job keeps going while other owners wait for it. Otherwise a
+        pending job never starts and a finished one is forgotten, so the
+        next submit() starts it again. A running job cannot be interrupted;
+        it stays tracked and a later submit() re-attaches to it instead of
+        starting a duplicate on the shared workers.
+
+        Returns:
+            bool: True if the job existed
+        """
+        with self._lock:
+            future = self._jobs.get(key)
+            if future is None:
+                return False
+            owners = self._owners[key]
+            owners.discard(owner)
+            if owners or not (future.done() or future.cancel()):
+                return True
+            del self._jobs[key]
+            del self._owners[key]
+            return True
+
+    def _drop_finished(self):
+        finished = [key for key, future in self._jobs.items() if future.done()]
+        for key in finished[:max(0, len(finished) - self._max_finished)]:
+            del self._jobs[key]
+            del self._owners[key]
+
+    def shutdown(self):
+        """Cancel pending jobs and stop the worker threads"""
+        self._executor.shutdown(wait=False, cancel_futures=True)
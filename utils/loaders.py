@@ -0,0 +1,195 @@
+import csv
+import io
+import re
+from collections import namedtuple
+import numpy as np
+from .helpers import grid_shape, is_power_of_two
+
+# File extensions understood by load_sbox_file()
+BINARY_EXTENSIONS = ('.bin',)
+TEXT_EXTENSIONS = ('.hex', '.txt', '.h', '.c')
+SBOX_EXTENSIONS = ('.csv', '.npy', '.xlsx', '.xls') + BINARY_EXTENSIONS + TEXT_EXTENSIONS
+
+# Rows checked per step by bijective_mask(), bounds memory on huge memmaps
+_VALIDATION_ROWS = 1 << 16
+
+# Widest S-box output accepted from text (values are stored as uint16)
+MAX_OUTPUT_BITS = 16
+
+SboxFile = namedtuple('SboxFile', ['sboxes', 'bijective'])
+SboxFile.__doc__ = """
+S-boxes read by load_sbox_file()
+
+- sboxes: Array (k, 2^n), one S-box per row; a read-only np.memmap for
+  .bin/.npy files, so rows are zero-copy views into the file
+- bijective: Bool array (k,), True where the row is a permutation
+"""
+
+def load_sbox_file(path, sbox_size=None, dtype=np.uint8):
+    """
+    Open a file holding one or more S-boxes
+
+    Supported formats:
+    - .bin: raw bytes, sbox_size entries per S-box (dtype sets the entry width)
+    - .npy: 1-D arrays and 2-D grids shaped like grid_shape() (16x16 for
+      8-bit) hold one S-box, other 2-D (k, 2^n) and 3-D (k, r, c) arrays
+      k S-boxes; sbox_size splits any array into rows of that size
+    - .hex/.txt/.h/.c: hex text or C arrays, see parse_sbox_text()
+    - .csv/.xlsx/.xls: one S-box in any grid shape
+
+    Args:
+        path (str): File path
+        sbox_size (int): Entries per S-box (default: 256 for .bin files that
+            hold a multiple of 256 entries, else the whole file)
+        dtype: Entry type of .bin files, e.g. '<u2' for 16-bit outputs
+
+    Returns:
+        SboxFile
+    """
+    lower = path.lower()
+
+    if lower.endswith(BINARY_EXTENSIONS):
+        entries = np.memmap(path, dtype=dtype, mode='r')
+        sboxes = entries.reshape(-1, _sbox_size(len(entries), sbox_size))
+    elif lower.endswith('.npy'):
+        sboxes = _array_sboxes(np.load(path, mmap_mode='r'), sbox_size)
+    else:
+        with open(path, 'rb') as f:
+            return parse_sbox_bytes(f.read(), path, sbox_size)
+
+    return SboxFile(sboxes, bijective_mask(sboxes))
+
+def parse_sbox_bytes(data, file_name, sbox_size=None):
+    """
+    Parse S-boxes from file content, e.g. a Streamlit upload
+
+    Same formats as load_sbox_file(); the format is taken from the
+    extension of file_name.
+
+    Returns:
+        SboxFile
+    """
+    lower = file_name.lower()
+
+    if lower.endswith(BINARY_EXTENSIONS):
+        entries = np.frombuffer(data, dtype=np.uint8)
+        sboxes = entries.reshape(-1, _sbox_size(len(entries), sbox_size))
+    elif lower.endswith('.npy'):
+        sboxes = _array_sboxes(np.load(io.BytesIO(data)), sbox_size)
+    elif lower.endswith(TEXT_EXTENSIONS):
+        sboxes = parse_sbox_text(data.decode(), sbox_size)
+    elif lower.endswith('.csv'):
+        rows = csv.reader(io.StringIO(data.decode()))
+        sboxes = np.array([[int(cell) for row in rows for cell in row if cell.strip()]])
+    else:
+        # Excel needs pandas/openpyxl; only import them when actually used
+        import pandas as pd
+        df = pd.read_excel(io.BytesIO(data), header=None)
+        sboxes = df.values.astype(int).reshape(1, -1)
+
+    return SboxFile(sboxes, bijective_mask(sboxes))
+
+def parse_sbox_text(text, sbox_size=None):
+    """
+    Parse S-boxes from hex text or C array source
+
+    - C arrays: every top-level {...} block is one S-box; entries may be
+      hex (0x63) or decimal, nested braces are flattened
+    - Plain hex: whitespace/comma separated bytes ("63 7c 77 ..." or
+      "0x63, 0x7c, ...") or continuous byte pairs ("637c77...", also
+      wrapped over several lines as written by xxd -p); the whole text is
+      one S-box unless sbox_size splits it
+
+    //, /* */ and # comments (and preprocessor lines) are ignored.
+
+    Returns:
+        numpy.ndarray: Array (k, 2^n), one S-box per row
+
+    Raises:
+        ValueError: Odd-length hex runs, values of more than MAX_OUTPUT_BITS
+            bits, or S-boxes of different sizes
+    """
+    text = re.sub(r'//[^\n]*|/\*.*?\*/|#[^\n]*', ' ', text, flags=re.S)
+
+    blocks = _brace_blocks(text)
+    if blocks:
+        groups = [[int(token, 0) for token in re.findall(r'0[xX][0-9a-fA-F]+|\d+', block)] for block in blocks]
+    else:
+        # 0x prefixes first, so "0x0c" is one token and not "0" and "0c"
+        tokens = []
+        for token in re.findall(r'0[xX][0-9a-fA-F]+|[0-9a-fA-F]+', text):
+            if len(token) <= 2 or token[:2].lower() == '0x':
+                tokens.append(token)
+            elif len(token) % 2:
+                raise ValueError(f"Hex run of odd length {len(token)} cannot be split into bytes")
+            else:
+                tokens.extend(re.findall(r'..', token))
+        groups = [[int(token, 16) for token in tokens]]
+
+    largest = max((value for group in groups for value in group), default=0)
+    if largest >> MAX_OUTPUT_BITS:
+        raise ValueError(f"S-box values must be integers between 0 and {(1 << MAX_OUTPUT_BITS) - 1}, got {largest}")
+
+    if sbox_size:
+        return np.array([value for group in groups for value in group]).reshape(-1, sbox_size)
+
+    if len({len(group) for group in groups}) != 1:
+        raise ValueError("All S-boxes in a file must have the same size")
+    return np.array(groups)
+
+def _brace_blocks(text):
+    """Contents of the top-level {...} blocks of text"""
+    blocks = []
+    depth = 0
+    for position, char in enumerate(text):
+        if char == '{':
+            if depth == 0:
+                start = position + 1
+            depth += 1
+        elif char == '}' and depth:
+            depth -= 1
+            if depth == 0:
+                blocks.append(text[start:position])
+    return blocks
+
+def _array_sboxes(array, sbox_size=None):
+    """
+    S-box rows of an array loaded from .npy
+
+    A 2-D array in the display layout of one S-box (grid_shape(), e.g. the
+    16x16 AES table) is that S-box, not 16 S-boxes of 16 entries.
+    """
+    if sbox_size:
+        return array.reshape(-1, _sbox_size(array.size, sbox_size))
+    if array.ndim == 1 or (array.ndim == 2 and is_power_of_two(array.size) and array.shape == grid_shape(array.size)):
+        return array.reshape(1, -1)
+    return array.reshape(len(array), -1)
+
+def _sbox_size(num_entries, sbox_size):
+    """Entries per S-box for a raw file of num_entries entries"""
+    if sbox_size is None:
+        sbox_size = 256 if num_entries >= 256 and num_entries % 256 == 0 else num_entries
+    if not is_power_of_two(sbox_size) or num_entries % sbox_size:
+        raise ValueError(f"File holds {num_entries} entries, not a multiple of a 2^n S-box size ({sbox_size})")
+    return sbox_size
+
+def bijective_mask(sboxes):
+    """
+    Check which S-boxes are permutations of 0..2^n-1
+
+    Args:
+        sboxes (numpy.ndarray): Array (k, 2^n), one S-box per row
+
+    Returns:
+        numpy.ndarray: Bool array (k,)
+    """
+    num_sboxes, size = sboxes.shape
+    expected = np.arange(size)
+    mask = np.empty(num_sboxes, dtype=bool)
+
+    # Sorting each row gives 0..2^n-1 exactly for a permutation
+    for start in range(0, num_sboxes, _VALIDATION_ROWS):
+        block = np.sort(sboxes[start:start + _VALIDATION_ROWS], axis=1)
+        mask[start:start + len(block)] = (block == expected).all(axis=1)
+
+    return mask
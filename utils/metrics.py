@@ -0,0 +1,71 @@
+from .linear_approximation import linear_approximation_probability
+from .nonlinearity import compute_nonlinearity
+from .avalanche_criterion import calculate_sac_value
+from .differential_approximation import calculate_dap
+from .bit_independence import calculate_bic_sac, calculate_bic_nl
+from .differential_uniformity import compute_differential_uniformity
+from .boomerang_uniformity import compute_boomerang_uniformity
+from .algebraic import algebraic_degree, quadratic_equation_count
+from .autocorrelation import absolute_indicator, sum_of_squares_indicator, linear_structure_count
+
+# Scalar metrics available to headless evaluation, keyed by short name.
+# Every function accepts a list or an SboxProfile.
+METRICS = {
+    'lap': linear_approximation_probability,
+    'nl': compute_nonlinearity,
+    'sac': calculate_sac_value,
+    'dap': calculate_dap,
+    'bic_sac': calculate_bic_sac,
+    'bic_nl': calculate_bic_nl,
+    'du': compute_differential_uniformity,
+    'bu': compute_boomerang_uniformity,
+    'deg': algebraic_degree,
+    'quad_eq': quadratic_equation_count,
+    'abs_ind': absolute_indicator,
+    'sos': sum_of_squares_indicator,
+    'lin_struct': linear_structure_count,
+}
+
+# Algorithm version of every stored result (see utils.result_store). Bump a
+# metric's version whenever a change alters its results, so values computed
+# by the old algorithm are never served again.
+METRIC_VERSIONS = {
+    'lap': 1,
+    'nl': 1,
+    'sac': 1,
+    'dap': 1,
+    'bic_sac': 1,
+    'bic_nl': 2,  # 2: computed on output bit pair XORs
+    'du': 1,
+    'bu': 1,
+    'deg': 1,
+    'quad_eq': 1,
+    'abs_ind': 1,
+    'sos': 1,
+    'lin_struct': 1,
+    # Value and matrix results, as shown in the Streamlit app
+    'sac_matrix': 1,
+    'bic_sac_matrix': 1,
+    'bic_nl_matrix': 2,
+    'algebraic': 1,
+    'autocorrelation': 1,
+}
+
+def resolve_metrics(names):
+    """
+    Validate a list of metric names
+
+    Args:
+        names (list or None): Metric names, None selects all metrics
+
+    Returns:
+        list: Metric names in registry order
+    """
+    if not names:
+        return list(METRICS)
+
+    unknown = [name for name in names if name not in METRICS]
+    if unknown:
+        raise ValueError(f"Unknown metric(s): {', '.join(unknown)}. Available: {', '.join(METRICS)}")
+
+    return [name for name in METRICS if name in names]
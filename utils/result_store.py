@@ -0,0 +1,165 @@
+import json
+import os
+import sqlite3
+import threading
+import time
+import numpy as np
+
+# Environment variable enabling the store (and overriding its location)
+STORE_PATH_VARIABLE = 'SBOX_RESULT_STORE'
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS results (
+    digest TEXT NOT NULL,
+    metric TEXT NOT NULL,
+    version INTEGER NOT NULL,
+    value TEXT NOT NULL,
+    created REAL NOT NULL,
+    PRIMARY KEY (digest, metric, version)
+)
+"""
+
+def default_store_path():
+    """$SBOX_RESULT_STORE, else ~/.cache/sbox-evaluation/results.sqlite"""
+    return configured_store_path() or os.path.join(
+        os.path.expanduser('~'), '.cache', 'sbox-evaluation', 'results.sqlite'
+    )
+
+def configured_store_path():
+    """
+    Store the user opted into through $SBOX_RESULT_STORE, or None
+
+    The store is opt-in: tools only write results to disk when this is set
+    or a path is passed explicitly (e.g. --store).
+    """
+    return os.environ.get(STORE_PATH_VARIABLE) or None
+
+class ResultStore:
+    """
+    On-disk metric results keyed by (S-box key, metric name, version)
+
+    The S-box key is SboxProfile.store_key: the content digest plus the
+    output width, since metrics such as LAP depend on both.
+
+    Backed by SQLite in WAL mode, so any number of threads and processes can
+    read while one writes; writers wait up to `timeout` seconds for the
+    lock. Each thread gets its own connection.
+
+    Values are stored as JSON. Lookups only match the requested version, so
+    bumping a metric's entry in METRIC_VERSIONS makes all older results
+    invisible without deleting them.
+    """
+
+    def __init__(self, path=None, timeout=30.0):
+        """
+        Args:
+            path (str): Database file (default: default_store_path())
+            timeout (float): Seconds to wait for a locked database
+        """
+        self.path = path or default_store_path()
+        self.timeout = timeout
+        self._local = threading.local()
+
+        directory = os.path.dirname(self.path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+
+        connection = self._connection()
+        connection.execute('PRAGMA journal_mode=WAL')
+        connection.execute(_SCHEMA)
+
+    def _connection(self):
+        connection = getattr(self._local, 'connection', None)
+        if connection is None:
+            # Autocommit; writes open their own transactions
+            connection = sqlite3.connect(self.path, timeout=self.timeout, isolation_level=None)
+            connection.execute('PRAGMA synchronous=NORMAL')
+            self._local.connection = connection
+        return connection
+
+    def get(self, digest, metric, version):
+        """Stored value, or None if there is none for this version"""
+        return self.get_many(digest, {metric: version}).get(metric)
+
+    def get_many(self, digest, versions):
+        """
+        Look up several metrics of one S-box
+
+        Args:
+            digest (str): S-box key (SboxProfile.store_key)
+            versions (dict): Metric name -> required version
+
+        Returns:
+            dict: Metric name -> value, for the metrics that are stored
+        """
+        if not versions:
+            return {}
+        rows = self._connection().execute(
+            'SELECT metric, version, value FROM results WHERE digest = ? AND metric IN (%s)'
+            % ','.join('?' * len(versions)),
+            [digest, *versions]
+        ).fetchall()
+        return {metric: json.loads(value) for metric, version, value in rows if versions[metric] == version}
+
+    def put(self, digest, metric, version, value):
+        """Store one result"""
+        self.put_many(digest, {metric: (version, value)})
+
+    def put_many(self, digest, results):
+        """
+        Store several results of one S-box in a single transaction
+
+        Args:
+            digest (str): S-box digest
+            results (dict): Metric name -> (version, value)
+        """
+        if not results:
+            return
+        created = time.time()
+        rows = [
+            (digest, metric, version, json.dumps(value, default=_json_default), created)
+            for metric, (version, value) in results.items()
+        ]
+        connection = self._connection()
+        with connection:
+            connection.execute('BEGIN IMMEDIATE')
+            connection.executemany('INSERT OR REPLACE INTO results VALUES (?, ?, ?, ?, ?)', rows)
+
+    def purge_stale(self, versions):
+        """
+        Delete results whose version differs from the current one
+
+        Args:
+            versions (dict): Metric name -> current version
+
+        Returns:
+            int: Number of deleted rows
+        """
+        connection = self._connection()
+        with connection:
+            connection.execute('BEGIN IMMEDIATE')
+            return sum(
+                connection.execute('DELETE FROM results WHERE metric = ? AND version != ?', (metric, version)).rowcount
+                for metric, version in versions.items()
+            )
+
+    def close(self):
+        """Close this thread's connection"""
+        connection = getattr(self._local, 'connection', None)
+        if connection is not None:
+            connection.close()
+            self._local.connection = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+def _json_default(value):
+    """NumPy scalars and arrays as plain JSON values"""
+    if isinstance(value, np.ndarray):
+        return value.tolist()
+    if isinstance(value, np.generic):
+        return value.item()
+    raise TypeError(f"Object of type {type(value).__name__} is not JSON serializable")
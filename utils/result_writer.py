@@ -0,0 +1,109 @@
+import csv
+import json
+import math
+import os
+import sys
+
+# Output format -> file extension
+WRITER_FORMATS = {'csv': '.csv', 'jsonl': '.jsonl', 'parquet': '.parquet'}
+
+# Columns written as text in Parquet; everything else is float64
+_STRING_COLUMNS = ('source', 'rejected_by')
+
+class ResultWriter:
+    """
+    Write result rows one at a time to CSV, JSON Lines or Parquet
+
+    Rows are written as they arrive, so memory use does not grow with the
+    number of S-boxes. Parquet output (requires pyarrow) buffers at most
+    row_group_size rows and writes each full buffer as one row group.
+
+    Use as a context manager, or call close() when done.
+    """
+
+    def __init__(self, target, columns, fmt=None, row_group_size=10000):
+        """
+        Args:
+            target (str or file): Output path, or an open text file (csv/jsonl only)
+            columns (list): Column names, in output order
+            fmt (str): 'csv', 'jsonl' or 'parquet' (default: from the file
+                extension of target, else csv)
+            row_group_size (int): Rows per Parquet row group
+        """
+        if fmt is None:
+            extension = os.path.splitext(target)[1].lower() if isinstance(target, str) else ''
+            fmt = next((name for name, ext in WRITER_FORMATS.items() if ext == extension), 'csv')
+        if fmt not in WRITER_FORMATS:
+            raise ValueError(f"Unknown output format '{fmt}'. Available: {', '.join(WRITER_FORMATS)}")
+
+        self.format = fmt
+        self.columns = list(columns)
+        self.rows_written = 0
+        self._row_group_size = row_group_size
+        self._owns_file = isinstance(target, str)
+
+        if fmt == 'parquet':
+            if not self._owns_file:
+                raise ValueError("Parquet output needs a file path")
+            import pyarrow as pa
+            import pyarrow.parquet as pq
+            self._pa = pa
+            self._schema = pa.schema([
+                (name, pa.int64() if name == 'index' else pa.string() if name in _STRING_COLUMNS else pa.float64())
+                for name in self.columns
+            ])
+            self._parquet = pq.ParquetWriter(target, self._schema)
+            self._buffer = {name: [] for name in self.columns}
+            return
+
+        self._file = open(target, 'w', newline='') if self._owns_file else target
+        if fmt == 'csv':
+            self._csv = csv.DictWriter(self._file, fieldnames=self.columns)
+            self._csv.writeheader()
+
+    def write(self, row):
+        """Write one row (dict keyed by column name; missing columns are empty)"""
+        if self.format == 'csv':
+            self._csv.writerow(row)
+        elif self.format == 'jsonl':
+            record = {name: _json_value(row.get(name)) for name in self.columns}
+            self._file.write(json.dumps(record) + '\n')
+        else:
+            for name in self.columns:
+                self._buffer[name].append(row.get(name))
+            if len(self._buffer[self.columns[0]]) >= self._row_group_size:
+                self._flush_row_group()
+        self.rows_written += 1
+
+    def _flush_row_group(self):
+        if not self._buffer[self.columns[0]]:
+            return
+        table = self._pa.Table.from_pydict(self._buffer, schema=self._schema)
+        self._parquet.write_table(table)
+        self._buffer = {name: [] for name in self.columns}
+
+    def close(self):
+        """Flush pending rows and close the output"""
+        if self.format == 'parquet':
+            self._flush_row_group()
+            self._parquet.close()
+        elif self._owns_file:
+            self._file.close()
+        else:
+            self._file.flush()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+def _json_value(value):
+    """NaN/inf are not valid JSON; write them as null"""
+    if isinstance(value, float) and not math.isfinite(value):
+        return None
+    return value
+
+def open_result_writer(path, columns, fmt=None, row_group_size=10000):
+    """ResultWriter for path, or for stdout if path is None"""
+    return ResultWriter(path if path else sys.stdout, columns, fmt, row_group_size)
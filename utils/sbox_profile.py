@@ -0,0 +1,128 @@
+import hashlib
+from functools import cached_property
+import numpy as np
+from .helpers import validate_and_pad_sbox, is_power_of_two, default_output_bits
+from .walsh import walsh_spectrum, autocorrelation_from_spectrum
+from .difference_distribution import difference_distribution_table
+from .boomerang_connectivity import boomerang_connectivity_table
+
+class SboxProfile:
+    """
+    Validated S-box with lazily computed, cached derived tables
+
+    The S-box is validated once; every table is derived on first access and
+    shared by all metrics that are computed from the same profile.
+    """
+
+    def __init__(self, sbox, output_bits=None):
+        """
+        Args:
+            sbox (list): S-box values; a power-of-two length 2^n sets the
+                input width n, other lengths are padded/truncated to 256
+            output_bits (int): Output width m; when omitted, inferred from
+                the largest value (e.g. 4 for a DES-style 6x4 S-box) but at
+                least 8 for 8-bit S-boxes, see default_output_bits()
+        """
+        if isinstance(sbox, np.ndarray) and sbox.dtype in (np.uint8, np.uint16) and is_power_of_two(len(sbox)):
+            # Already in range (e.g. a memory-mapped row from utils.loaders); copy to detach it
+            values = np.array(sbox.ravel())
+            if values.dtype == np.uint16 and values.max() < 256:
+                values = values.astype(np.uint8)
+        else:
+            # Validate and pad S-box
+            values = validate_and_pad_sbox([int(v) for v in sbox])
+            values = np.array(values, dtype=np.uint8 if max(values) < 256 else np.uint16)
+
+        self.values = values
+        self.values.flags.writeable = False
+        self.input_bits = len(values).bit_length() - 1
+
+        required_bits = max(1, int(values.max()).bit_length())
+        if output_bits is None:
+            output_bits = default_output_bits(len(values), values.max())
+        elif output_bits < required_bits:
+            raise ValueError(f"S-box values need {required_bits} output bits, got output_bits={output_bits}")
+        self.output_bits = output_bits
+
+    def __len__(self):
+        return len(self.values)
+
+    def tolist(self):
+        """Return the S-box as a plain list of ints"""
+        return self.values.tolist()
+
+    @cached_property
+    def digest(self):
+        """SHA-256 hex digest of the validated S-box bytes"""
+        return sbox_digest(self.values)
+
+    @property
+    def store_key(self):
+        """ResultStore key: the digest plus the output width m, which it leaves out"""
+        return f'{self.digest}/{self.output_bits}'
+
+    @cached_property
+    def bit_planes(self):
+        """Array (m, 2^n): row j holds output bit j (LSB first) of every S(x)"""
+        shifts = np.arange(self.output_bits)[:, None]
+        return ((self.values[None, :] >> shifts) & 1).astype(np.uint8)
+
+    @cached_property
+    def ddt(self):
+        """Difference Distribution Table, indexed by [input diff, output diff]"""
+        return difference_distribution_table(self.values, self.output_bits)
+
+    @cached_property
+    def is_bijective(self):
+        """True if the S-box is a permutation of 0..2^n-1"""
+        return self.output_bits == self.input_bits and len(np.unique(self.values)) == len(self.values)
+
+    @cached_property
+    def bct(self):
+        """Boomerang Connectivity Table, indexed by [input diff, output diff] (bijective S-boxes only)"""
+        return boomerang_connectivity_table(self.values, self.output_bits)
+
+    @cached_property
+    def walsh_spectrum(self):
+        """Walsh spectrum of all component functions, indexed by [output mask, input mask]"""
+        return walsh_spectrum(self.values, self.output_bits)
+
+    @cached_property
+    def autocorrelation(self):
+        """Autocorrelation Table of all component functions, indexed by [output mask, input difference]"""
+        return autocorrelation_from_spectrum(self.walsh_spectrum)
+
+    @cached_property
+    def lat(self):
+        """Linear Approximation Table, indexed by [output mask, input mask]"""
+        return self.walsh_spectrum // 2
+
+    @cached_property
+    def avalanche(self):
+        """Array (n, 2^n): row i holds the derivative S(x) xor S(x xor 2^i)"""
+        inputs = np.arange(len(self.values))
+        flips = 1 << np.arange(self.input_bits)[:, None]
+        return self.values[inputs[None, :]] ^ self.values[inputs[None, :] ^ flips]
+
+    @cached_property
+    def avalanche_bits(self):
+        """Boolean array (n, 2^n, m): output bit j of S(x) xor S(x xor 2^i)"""
+        shifts = np.arange(self.output_bits)
+        return ((self.avalanche[:, :, None] >> shifts) & 1).astype(bool)
+
+def sbox_digest(sbox):
+    """
+    Content hash of an S-box, usable as a cache key
+
+    8-bit S-boxes are hashed as one byte per entry, wider ones as
+    little-endian uint16.
+    """
+    values = np.asarray(sbox)
+    dtype = '<u1' if values.size and values.max() < 256 else '<u2'
+    return hashlib.sha256(values.astype(dtype).tobytes()).hexdigest()
+
+def as_profile(sbox):
+    """Return `sbox` itself if it is already an SboxProfile, otherwise wrap it"""
+    if isinstance(sbox, SboxProfile):
+        return sbox
+    return SboxProfile(sbox)
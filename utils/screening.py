@@ -0,0 +1,193 @@
+from collections import namedtuple
+import numpy as np
+from .sbox_profile import as_profile
+from .walsh import fast_walsh_hadamard, spectrum_dtype
+
+# Supported bounds, in evaluation order (cheapest checks first)
+BOUND_ORDER = ['bijective', 'du_max', 'dap_max', 'nl_min', 'bic_nl_min', 'lap_max', 'bu_max']
+
+# Rows of the DDT / Walsh spectrum examined per step before checking a bound
+_ROWS_PER_STEP = 16
+
+ScreeningResult = namedtuple('ScreeningResult', ['passed', 'rejected_by', 'values'])
+ScreeningResult.__doc__ = """
+Outcome of screen_sbox()
+
+- passed: True if every bound holds
+- rejected_by: Name of the first violated bound, or None
+- values: Metric values that were computed; for the rejecting metric this
+  is the first value found beyond the bound, not necessarily the exact one
+"""
+
+def screen_sbox(sbox, bounds):
+    """
+    Check an S-box against per-metric bounds, stopping at the first violation
+
+    Args:
+        sbox (list or SboxProfile): Input S-box
+        bounds (dict): Any of
+            - 'bijective': True to require a permutation
+            - 'du_max': Maximum differential uniformity
+            - 'dap_max': Maximum DAP
+            - 'nl_min': Minimum nonlinearity (as compute_nonlinearity)
+            - 'bic_nl_min': Minimum BIC-NL
+            - 'lap_max': Maximum LAP
+            - 'bu_max': Maximum boomerang uniformity (fails for non-bijective S-boxes)
+
+    Returns:
+        ScreeningResult
+    """
+    unknown = set(bounds) - set(BOUND_ORDER)
+    if unknown:
+        raise ValueError(f"Unknown bound(s): {', '.join(sorted(unknown))}. Available: {', '.join(BOUND_ORDER)}")
+
+    profile = as_profile(sbox)
+    num_inputs = len(profile)
+    values = {}
+
+    if bounds.get('bijective'):
+        values['bijective'] = profile.is_bijective
+        if not values['bijective']:
+            return ScreeningResult(False, 'bijective', values)
+
+    # DU and DAP share one DDT scan; the tighter bound decides
+    du_limits = []
+    if 'du_max' in bounds:
+        du_limits.append((bounds['du_max'], 'du_max'))
+    if 'dap_max' in bounds:
+        du_limits.append((bounds['dap_max'] * num_inputs, 'dap_max'))
+    if du_limits:
+        limit, name = min(du_limits)
+        du = _max_ddt_entry(profile, limit)
+        values['du'] = du
+        values['dap'] = du / num_inputs
+        if du > limit:
+            return ScreeningResult(False, name, values)
+
+    if 'nl_min' in bounds:
+        coordinate_masks = [1 << bit for bit in range(profile.output_bits)]
+        nl = _min_nonlinearity(profile, _component_signs(profile, coordinate_masks), bounds['nl_min'], skip_constant=True)
+        values['nl'] = nl
+        if nl < bounds['nl_min']:
+            return ScreeningResult(False, 'nl_min', values)
+
+    if 'bic_nl_min' in bounds:
+        first, second = np.triu_indices(profile.output_bits, 1)
+        planes = profile.bit_planes
+        pair_signs = 1 - 2 * (planes[first] ^ planes[second]).astype(np.int8)
+        bic_nl = _min_nonlinearity(profile, pair_signs, bounds['bic_nl_min'], skip_constant=False)
+        values['bic_nl'] = bic_nl
+        if bic_nl < bounds['bic_nl_min']:
+            return ScreeningResult(False, 'bic_nl_min', values)
+
+    if 'lap_max' in bounds:
+        max_bias = _max_component_bias(profile, bounds['lap_max'] * 2 * num_inputs)
+        values['lap'] = max_bias / num_inputs / 2
+        if values['lap'] > bounds['lap_max']:
+            return ScreeningResult(False, 'lap_max', values)
+
+    if 'bu_max' in bounds:
+        # BCT(a, b) >= DDT(a, b), so a DU above the bound rejects without a BCT
+        if values.get('du', 0) > bounds['bu_max'] or not profile.is_bijective:
+            return ScreeningResult(False, 'bu_max', values)
+        values['bu'] = int(profile.bct[1:, 1:].max())
+        if values['bu'] > bounds['bu_max']:
+            return ScreeningResult(False, 'bu_max', values)
+
+    return ScreeningResult(True, None, values)
+
+def _max_ddt_entry(profile, limit):
+    """Max DDT entry over non-zero input differences, scanning rows until one exceeds limit"""
+    if 'ddt' in profile.__dict__:  # Already computed for this profile
+        return int(profile.ddt[1:].max())
+
+    values = profile.values.astype(np.int64)
+    num_inputs = len(values)
+    num_outputs = 1 << profile.output_bits
+    inputs = np.arange(num_inputs)
+    max_count = 0
+
+    for start in range(1, num_inputs, _ROWS_PER_STEP):
+        input_diffs = np.arange(start, min(start + _ROWS_PER_STEP, num_inputs))[:, None]
+        output_diffs = values[inputs[None, :]] ^ values[inputs[None, :] ^ input_diffs]
+        offsets = (input_diffs - start) * num_outputs
+        counts = np.bincount((offsets + output_diffs).ravel())
+
+        max_count = max(max_count, int(counts.max()))
+        if max_count > limit:
+            break
+
+    return max_count
+
+def _component_signs(profile, masks):
+    """(-1)^(b . S(x)) rows for the given output masks"""
+    planes = profile.bit_planes
+    signs = np.ones((len(masks), len(profile)), dtype=np.int8)
+    for row, mask in enumerate(masks):
+        for bit in range(profile.output_bits):
+            if mask >> bit & 1:
+                signs[row] *= 1 - 2 * planes[bit].astype(np.int8)
+    return signs
+
+def _min_nonlinearity(profile, signs, nl_min, skip_constant):
+    """Min nonlinearity over the given sign rows, stopping once below nl_min"""
+    num_inputs = len(profile)
+    dtype = spectrum_dtype(num_inputs)
+    first_column = 1 if skip_constant else 0
+    min_nl = num_inputs
+
+    for start in range(0, len(signs), _ROWS_PER_STEP):
+        spectrum = fast_walsh_hadamard(signs[start:start + _ROWS_PER_STEP], dtype)
+        max_bias = int(np.abs(spectrum[:, first_column:]).max())
+        min_nl = min(min_nl, num_inputs // 2 - max_bias // 2)
+        if min_nl < nl_min:
+            break
+
+    return min_nl
+
+def _max_component_bias(profile, limit):
+    """Max |W(a, b)| over non-zero masks, transforming components until one exceeds limit"""
+    if 'walsh_spectrum' in profile.__dict__:  # Already computed for this profile
+        return int(np.abs(profile.walsh_spectrum[1:, 1:]).max())
+
+    num_inputs = len(profile)
+    dtype = spectrum_dtype(num_inputs)
+    planes = profile.bit_planes
+    max_bias = 0
+
+    # Components b in [2^k, 2^(k+1)) are the components below 2^k times output bit k
+    signs = np.ones((1, num_inputs), dtype=np.int8)
+    for bit in range(profile.output_bits):
+        coordinate = 1 - 2 * planes[bit].astype(np.int8)
+        new_signs = signs * coordinate
+
+        for start in range(0, len(new_signs), _ROWS_PER_STEP):
+            spectrum = fast_walsh_hadamard(new_signs[start:start + _ROWS_PER_STEP], dtype)
+            max_bias = max(max_bias, int(np.abs(spectrum[:, 1:]).max()))
+            if max_bias > limit:
+                return max_bias
+
+        signs = np.concatenate([signs, new_signs])
+
+    return max_bias
+
+def parse_bound(text):
+    """
+    Parse a command-line bound such as 'nl>=104', 'du<=6' or 'bijective'
+
+    Returns:
+        tuple: (bound name, value) for screen_sbox()
+    """
+    text = text.replace(' ', '')
+    if text == 'bijective':
+        return 'bijective', True
+
+    for operator, suffix in (('>=', '_min'), ('<=', '_max')):
+        if operator in text:
+            metric, value = text.split(operator, 1)
+            name = metric.lower() + suffix
+            if name not in BOUND_ORDER:
+                break
+            return name, float(value)
+
+    raise ValueError(f"Invalid bound '{text}'. Use e.g. nl>=104, du<=6, dap<=0.02, lap<=0.07, bic_nl>=100, bu<=6, bijective")
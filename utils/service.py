@@ -0,0 +1,500 @@
+import json
+import queue
+import threading
+import time
+from collections import OrderedDict, deque
+from concurrent.futures import Future
+from http import HTTPStatus
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlsplit
+import numpy as np
+from .metrics import METRICS, METRIC_VERSIONS, resolve_metrics
+from .sbox_profile import SboxProfile, sbox_digest
+from .helpers import is_power_of_two
+from .loaders import parse_sbox_bytes
+from .baseline import BASELINE_METRICS, batch_metrics
+from .autocorrelation import batch_autocorrelation
+
+# Metrics in the order batch_autocorrelation() returns them
+AUTOCORRELATION_METRICS = ('abs_ind', 'sos', 'lin_struct')
+
+# Largest request body accepted, in bytes
+MAX_BODY_BYTES = 64 << 20
+
+# Default widest S-box accepted: the DDT, Walsh spectrum and BCT of an
+# n-bit S-box have 4^n entries each, so 16-bit S-boxes would need GiBs
+MAX_INPUT_BITS = 10
+
+# Binary request bodies, by Content-Type: file name handed to parse_sbox_bytes
+BINARY_CONTENT_TYPES = {
+    'application/octet-stream': 'request.bin',
+    'application/x-npy': 'request.npy',
+    'text/plain': 'request.hex',
+}
+
+# Latencies kept for the percentiles reported by /stats
+_LATENCY_WINDOW = 4096
+
+# Default of LRUCache.get(), tells a miss apart from a cached None
+_MISSING = object()
+
+class LRUCache:
+    """Thread-safe mapping that keeps the `max_entries` most recently used items"""
+
+    def __init__(self, max_entries):
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        self.max_entries = max_entries
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, key, default=None):
+        """Cached value of `key`, or `default` (values may be None themselves)"""
+        with self._lock:
+            value = self._entries.get(key, _MISSING)
+            if value is _MISSING:
+                self.misses += 1
+                return default
+            self.hits += 1
+            self._entries.move_to_end(key)
+            return value
+
+    def put(self, key, value):
+        with self._lock:
+            self._entries[key] = value
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def __len__(self):
+        return len(self._entries)
+
+class ServiceStats:
+    """Request, batch and cache counters of a running service"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.started = time.monotonic()
+        self.requests = 0
+        self.errors = 0
+        self.sboxes = 0
+        self.batches = 0
+        self.batched_requests = 0
+        self.batched_sboxes = 0
+        self.largest_batch = 0
+        self.values_cached = 0
+        self.values_stored = 0
+        self.values_vectorized = 0
+        self.values_computed = 0
+        self.latencies = deque(maxlen=_LATENCY_WINDOW)
+
+    def record_request(self, seconds, sboxes, error=False):
+        with self._lock:
+            self.requests += 1
+            self.errors += error
+            self.sboxes += sboxes
+            self.latencies.append(seconds)
+
+    def record_batch(self, requests, sboxes, cached, stored, vectorized, computed):
+        with self._lock:
+            self.batches += 1
+            self.batched_requests += requests
+            self.batched_sboxes += sboxes
+            self.largest_batch = max(self.largest_batch, sboxes)
+            self.values_cached += cached
+            self.values_stored += stored
+            self.values_vectorized += vectorized
+            self.values_computed += computed
+
+    def snapshot(self):
+        """Counters as a JSON-ready dict"""
+        with self._lock:
+            uptime = time.monotonic() - self.started
+            latencies = np.array(self.latencies) * 1e3
+            return {
+                'uptime_seconds': round(uptime, 3),
+                'requests': self.requests,
+                'errors': self.errors,
+                'sboxes': self.sboxes,
+                'requests_per_second': round(self.requests / uptime, 3),
+                'sboxes_per_second': round(self.sboxes / uptime, 3),
+                'latency_ms': {
+                    name: round(float(np.percentile(latencies, q)), 3) if len(latencies) else None
+                    for name, q in (('p50', 50), ('p90', 90), ('p99', 99), ('max', 100))
+                },
+                'batches': self.batches,
+                'mean_requests_per_batch': round(self.batched_requests / self.batches, 3) if self.batches else None,
+                'mean_sboxes_per_batch': round(self.batched_sboxes / self.batches, 3) if self.batches else None,
+                'largest_batch': self.largest_batch,
+                'values': {
+                    'cached': self.values_cached,
+                    'stored': self.values_stored,
+                    'vectorized': self.values_vectorized,
+                    'computed': self.values_computed,
+                },
+            }
+
+class _Request:
+    __slots__ = ('profiles', 'metrics', 'future')
+
+    def __init__(self, profiles, metrics):
+        self.profiles = profiles
+        self.metrics = metrics
+        self.future = Future()
+
+class EvaluationService:
+    """
+    Metric evaluation shared by concurrent callers
+
+    Requests are queued and a single batching thread takes everything that
+    arrives within `max_delay` seconds (up to `max_batch` S-boxes) as one
+    batch: S-boxes are deduplicated by digest, finished values come from a
+    warm in-memory result cache or the ResultStore, and the remaining
+    bijective S-boxes of up to 8 bits are evaluated together with the
+    vectorized baseline kernels (batch_metrics). Other metrics and S-boxes
+    go through the utils.metrics functions on cached SboxProfiles, whose
+    derived tables stay warm for later requests.
+    """
+
+    def __init__(self, max_batch=256, max_delay=0.005, profile_cache_size=256,
+                 result_cache_size=1 << 16, store=None, max_input_bits=MAX_INPUT_BITS):
+        """
+        Args:
+            max_batch (int): S-boxes per batch before it is closed early
+            max_delay (float): Seconds a batch waits for more requests
+            profile_cache_size (int): SboxProfiles kept in memory
+            result_cache_size (int): Metric values kept in memory
+            store (ResultStore): Persistent results, optional
+            max_input_bits (int): Widest S-box (2^n entries) accepted by
+                the HTTP front end
+        """
+        self.max_batch = max_batch
+        self.max_input_bits = max_input_bits
+        self.max_delay = max_delay
+        self.profiles = LRUCache(profile_cache_size)
+        self.results = LRUCache(result_cache_size)
+        self.store = store
+        self.stats = ServiceStats()
+        self._queue = queue.Queue()
+        self._thread = threading.Thread(target=self._run, name='sbox-batcher', daemon=True)
+        self._thread.start()
+
+    def profile(self, sbox):
+        """Cached SboxProfile of `sbox` (validated on the caller's thread)"""
+        if isinstance(sbox, np.ndarray):
+            profile = self.profiles.get(sbox_digest(sbox))
+            if profile is not None:
+                return profile
+        profile = SboxProfile(sbox)
+        self.profiles.put(profile.digest, profile)
+        return profile
+
+    def evaluate(self, sboxes, metrics=None, timeout=None):
+        """
+        Evaluate S-boxes, batched with concurrent calls
+
+        Args:
+            sboxes (list): S-boxes (lists or arrays)
+            metrics (list): Metric names, None selects all
+            timeout (float): Seconds to wait for the batch, None waits forever
+
+        Returns:
+            list: One dict per S-box with 'digest', 'bijective' and the metric values
+        """
+        metrics = resolve_metrics(metrics)
+        request = _Request([self.profile(_as_values(sbox)) for sbox in sboxes], metrics)
+        self._queue.put(request)
+        values = request.future.result(timeout)
+        return [
+            {'digest': profile.digest, 'bijective': bool(profile.is_bijective),
+             **{name: values[profile.digest, name] for name in metrics}}
+            for profile in request.profiles
+        ]
+
+    def close(self):
+        """Stop the batching thread once queued requests are served"""
+        self._queue.put(None)
+        self._thread.join()
+
+    def _run(self):
+        while True:
+            request = self._queue.get()
+            if request is None:
+                return
+
+            batch = [request]
+            size = len(request.profiles)
+            deadline = time.monotonic() + self.max_delay
+            while size < self.max_batch:
+                try:
+                    request = self._queue.get(timeout=max(0.0, deadline - time.monotonic()))
+                except queue.Empty:
+                    break
+                if request is None:
+                    self._queue.put(None)
+                    break
+                batch.append(request)
+                size += len(request.profiles)
+
+            try:
+                values = self._evaluate_batch(batch)
+            except Exception:
+                # Isolate the failing request: retry every request on its own
+                for request in batch:
+                    try:
+                        request.future.set_result(self._evaluate_batch([request]))
+                    except Exception as e:
+                        request.future.set_exception(e)
+            else:
+                for request in batch:
+                    request.future.set_result(values)
+
+    def _evaluate_batch(self, batch):
+        """Values of every (digest, metric) asked for by the batch"""
+        wanted = {}
+        for request in batch:
+            for profile in request.profiles:
+                entry = wanted.setdefault(profile.digest, (profile, set()))
+                entry[1].update(request.metrics)
+
+        values = {}
+        missing = {}
+        cached = stored = 0
+        for digest, (profile, metrics) in wanted.items():
+            for name in metrics:
+                value = self.results.get((digest, name), _MISSING)
+                if value is not _MISSING:
+                    values[digest, name] = value
+                    cached += 1
+            left = {name for name in metrics if (digest, name) not in values}
+            if left and self.store is not None:
+                found = self.store.get_many(profile.store_key, {name: METRIC_VERSIONS[name] for name in left})
+                for name, value in found.items():
+                    values[digest, name] = value
+                    self.results.put((digest, name), value)
+                stored += len(found)
+                left -= found.keys()
+            if left:
+                missing[digest] = (profile, left)
+
+        computed = {}
+        vectorized = self._evaluate_vectorized(missing, computed)
+        for digest, (profile, metrics) in missing.items():
+            for name in metrics:
+                if (digest, name) not in computed:
+                    computed[digest, name] = METRICS[name](profile)
+
+        if self.store is not None:
+            for digest, (profile, metrics) in missing.items():
+                self.store.put_many(profile.store_key, {name: (METRIC_VERSIONS[name], computed[digest, name]) for name in metrics})
+        for key, value in computed.items():
+            self.results.put(key, value)
+        values.update(computed)
+
+        self.stats.record_batch(len(batch), len(wanted), cached, stored, vectorized, len(computed) - vectorized)
+        return values
+
+    def _evaluate_vectorized(self, missing, computed):
+        """
+        Evaluate metrics of S-boxes of up to 8 bits as stacks
+
+        BASELINE_METRICS of bijective S-boxes go through batch_metrics(),
+        AUTOCORRELATION_METRICS of any S-box through batch_autocorrelation().
+        S-boxes are grouped by shape and by the metrics they still need.
+
+        Returns:
+            int: Number of values added to `computed`
+        """
+        groups = {}
+        autocorrelation_groups = {}
+        for digest, (profile, metrics) in missing.items():
+            if profile.input_bits > 8:
+                continue
+            names = frozenset(metrics & BASELINE_METRICS.keys())
+            if names and profile.is_bijective:
+                groups.setdefault((len(profile), names), []).append(digest)
+            if not metrics.isdisjoint(AUTOCORRELATION_METRICS):
+                autocorrelation_groups.setdefault((len(profile), profile.output_bits), []).append(digest)
+
+        count = 0
+        for (_, names), digests in groups.items():
+            stack = np.stack([missing[digest][0].values for digest in digests])
+            for name, column in batch_metrics(stack, names).items():
+                for digest, value in zip(digests, column.tolist()):
+                    computed[digest, name] = value
+                count += len(digests)
+
+        for (_, output_bits), digests in autocorrelation_groups.items():
+            stack = np.stack([missing[digest][0].values for digest in digests])
+            columns = batch_autocorrelation(stack, output_bits)
+            for name, column in zip(AUTOCORRELATION_METRICS, columns):
+                for digest, value in zip(digests, column.tolist()):
+                    if name in missing[digest][1]:
+                        computed[digest, name] = value
+                        count += 1
+        return count
+
+def _as_values(sbox):
+    """
+    S-box as a uint8/uint16 array when it needs no padding
+
+    Such arrays are hashed before validation, so S-boxes seen before skip
+    SboxProfile construction; anything else is validated as a list.
+    """
+    values = np.asarray(sbox)
+    if (values.ndim == 1 and values.dtype.kind in 'iu' and is_power_of_two(len(values))
+            and values.min() >= 0 and values.max() < 1 << 16):
+        return values.astype(np.uint8 if values.max() < 256 else np.uint16)
+    return list(sbox)
+
+def parse_evaluation_request(body, content_type, query, max_input_bits=MAX_INPUT_BITS):
+    """
+    Decode an /evaluate request body
+
+    JSON bodies hold {"sbox": [...]} or {"sboxes": [[...], ...]} and an
+    optional "metrics" list. Binary bodies (see BINARY_CONTENT_TYPES) are
+    parsed like uploaded files; metrics and the entries per S-box come from
+    the query string (?metrics=nl,du&sbox_size=256).
+
+    S-boxes of more than 2^max_input_bits entries are rejected before any
+    table is built.
+
+    Returns:
+        tuple: (list of S-boxes, list of metric names or None)
+    """
+    sboxes, metrics = _decode_request(body, content_type, query)
+    largest = max((len(sbox) for sbox in sboxes), default=0)
+    if largest > 1 << max_input_bits:
+        raise ValueError(f'S-boxes may have at most 2^{max_input_bits} = {1 << max_input_bits} entries, got {largest}')
+    return sboxes, metrics
+
+def _decode_request(body, content_type, query):
+    """S-boxes and metric names of an /evaluate request, see parse_evaluation_request()"""
+    content_type = content_type.split(';')[0].strip().lower()
+    metrics = query.get('metrics', [None])[0]
+    metrics = metrics.split(',') if metrics else None
+
+    if content_type in ('', 'application/json'):
+        try:
+            payload = json.loads(body)
+        except json.JSONDecodeError as e:
+            raise ValueError(f'Invalid JSON: {e}') from None
+        if not isinstance(payload, dict):
+            raise ValueError('JSON body must be an object with "sbox" or "sboxes"')
+        if 'sbox' in payload:
+            sboxes = [payload['sbox']]
+        elif 'sboxes' in payload:
+            sboxes = payload['sboxes']
+        else:
+            raise ValueError('JSON body must contain "sbox" or "sboxes"')
+        if not isinstance(sboxes, list) or not all(isinstance(sbox, list) and sbox for sbox in sboxes):
+            raise ValueError('S-boxes must be non-empty lists of integers')
+        if not all(isinstance(value, int) for sbox in sboxes for value in sbox):
+            raise ValueError('S-box values must be integers')
+        metrics = payload.get('metrics', metrics)
+        if isinstance(metrics, str):
+            metrics = metrics.split(',')
+        return sboxes, metrics
+
+    if content_type in BINARY_CONTENT_TYPES:
+        sbox_size = query.get('sbox_size', [None])[0]
+        loaded = parse_sbox_bytes(body, BINARY_CONTENT_TYPES[content_type], int(sbox_size) if sbox_size else None)
+        return list(loaded.sboxes), metrics
+
+    raise ValueError(f'Unsupported Content-Type {content_type!r}; use application/json or '
+                     f"{', '.join(BINARY_CONTENT_TYPES)}")
+
+class EvaluationHandler(BaseHTTPRequestHandler):
+    """
+    HTTP front end of an EvaluationService
+
+    - POST /evaluate: evaluate one or many S-boxes
+    - GET /metrics: available metrics and their versions
+    - GET /stats: throughput, latency, batching and cache counters
+    - GET /health: liveness check
+    """
+
+    service = None
+    protocol_version = 'HTTP/1.1'
+    quiet = False
+
+    def do_GET(self):
+        path = urlsplit(self.path).path
+        if path == '/health':
+            self._send_json({'status': 'ok'})
+        elif path == '/metrics':
+            self._send_json({name: METRIC_VERSIONS[name] for name in METRICS})
+        elif path == '/stats':
+            stats = self.service.stats.snapshot()
+            stats['cache'] = {
+                'profiles': len(self.service.profiles),
+                'profile_hits': self.service.profiles.hits,
+                'results': len(self.service.results),
+                'result_hits': self.service.results.hits,
+            }
+            self._send_json(stats)
+        else:
+            self._send_error(HTTPStatus.NOT_FOUND, f'Unknown path {path}')
+
+    def do_POST(self):
+        url = urlsplit(self.path)
+        if url.path != '/evaluate':
+            self._send_error(HTTPStatus.NOT_FOUND, f'Unknown path {url.path}')
+            return
+
+        start = time.perf_counter()
+        length = int(self.headers.get('Content-Length') or 0)
+        if length > MAX_BODY_BYTES:
+            self._send_error(HTTPStatus.REQUEST_ENTITY_TOO_LARGE, f'Body exceeds {MAX_BODY_BYTES} bytes')
+            self.close_connection = True
+            return
+        body = self.rfile.read(length)
+
+        sboxes = []
+        try:
+            sboxes, metrics = parse_evaluation_request(body, self.headers.get('Content-Type', ''), parse_qs(url.query),
+                                                       self.service.max_input_bits)
+            results = self.service.evaluate(sboxes, metrics)
+        except ValueError as e:
+            self.service.stats.record_request(time.perf_counter() - start, len(sboxes), error=True)
+            self._send_error(HTTPStatus.BAD_REQUEST, str(e))
+            return
+        except Exception as e:
+            self.service.stats.record_request(time.perf_counter() - start, len(sboxes), error=True)
+            self._send_error(HTTPStatus.INTERNAL_SERVER_ERROR, f'{type(e).__name__}: {e}')
+            return
+
+        self.service.stats.record_request(time.perf_counter() - start, len(sboxes))
+        self._send_json({'results': results})
+
+    def _send_json(self, payload, status=HTTPStatus.OK):
+        data = json.dumps(payload).encode()
+        self.send_response(status)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+
+    def _send_error(self, status, message):
+        self._send_json({'error': message}, status)
+
+    def log_message(self, format, *args):
+        if not self.quiet:
+            super().log_message(format, *args)
+
+class EvaluationServer(ThreadingHTTPServer):
+    """One thread per connection, with room for bursts of concurrent clients"""
+
+    daemon_threads = True
+    # The socketserver default of 5 pending connections makes bursts of
+    # clients wait for TCP SYN retries (about 1 s)
+    request_queue_size = 128
+
+def create_server(service, host='127.0.0.1', port=8000, quiet=False):
+    """
+    Threaded HTTP server for `service`; call serve_forever() to run it
+
+    Port 0 picks a free port, see server.server_address.
+    """
+    handler = type('Handler', (EvaluationHandler,), {'service': service, 'quiet': quiet})
+    return EvaluationServer((host, port), handler)
@@ -0,0 +1,352 @@
+import math
+import operator
+import os
+from functools import reduce
+from itertools import repeat
+from concurrent.futures import ProcessPoolExecutor
+import numpy as np
+from .sbox_profile import as_profile
+
+# PRESENT S-box and bit permutation (bit i of the state moves to bit 16 i mod 63)
+PRESENT_SBOX = [0xC, 0x5, 0x6, 0xB, 0x9, 0x0, 0xA, 0xD, 0x3, 0xE, 0xF, 0x8, 0x4, 0x7, 0x1, 0x2]
+PRESENT_PERMUTATION = [16 * bit % 63 for bit in range(63)] + [63]
+
+TRAIL_KINDS = ('differential', 'linear')
+
+# Tolerance when comparing sums of -log2 weights
+_EPSILON = 1e-9
+
+def transition_weights(sbox, kind='differential'):
+    """
+    -log2 weight of every S-box transition a -> b
+
+    - differential: probability DDT[a, b] / 2^n
+    - linear: squared correlation (W[b, a] / 2^n)^2, a being the input mask
+
+    Args:
+        sbox (list or SboxProfile): Input S-box
+        kind (str): 'differential' or 'linear'
+
+    Returns:
+        np.ndarray: Array (2^n, 2^m) indexed by [input, output], inf for
+        impossible transitions
+    """
+    profile = as_profile(sbox)
+    if kind == 'differential':
+        probabilities = profile.ddt / len(profile)
+    elif kind == 'linear':
+        probabilities = (profile.walsh_spectrum.T.astype(np.float64) / len(profile)) ** 2
+    else:
+        raise ValueError(f"Unknown trail kind {kind!r}. Available: {', '.join(TRAIL_KINDS)}")
+
+    with np.errstate(divide='ignore'):
+        return -np.log2(probabilities)
+
+def layer_matrix(layer, block_bits):
+    """
+    GF(2) matrix of a linear layer, y = M x with bit i of the state at index i
+
+    Args:
+        layer (list): Bit permutation (bit i moves to layer[i]) or a
+            block_bits x block_bits 0/1 matrix
+        block_bits (int): State width
+
+    Returns:
+        np.ndarray: Boolean matrix (block_bits, block_bits)
+    """
+    layer = np.asarray(layer)
+    if layer.ndim == 1:
+        if sorted(layer.tolist()) != list(range(block_bits)):
+            raise ValueError(f'Bit permutation must be a permutation of 0..{block_bits - 1}')
+        matrix = np.zeros((block_bits, block_bits), dtype=bool)
+        matrix[layer, np.arange(block_bits)] = True
+        return matrix
+
+    if layer.shape != (block_bits, block_bits):
+        raise ValueError(f'Linear layer must be a {block_bits}x{block_bits} matrix, got {layer.shape}')
+    return layer.astype(bool)
+
+def _gf2_inverse(matrix):
+    """Inverse of a square boolean matrix over GF(2), by Gauss-Jordan elimination"""
+    size = len(matrix)
+    rows = np.concatenate([np.array(matrix, dtype=bool), np.eye(size, dtype=bool)], axis=1)
+
+    for column in range(size):
+        candidates = np.flatnonzero(rows[column:, column])
+        if not len(candidates):
+            raise ValueError('Linear layer is not invertible')
+        pivot = column + candidates[0]
+        rows[[column, pivot]] = rows[[pivot, column]]
+
+        others = rows[:, column].copy()
+        others[column] = False
+        rows[others] ^= rows[column]
+
+    return rows[:, size:]
+
+class TrailSearch:
+    """
+    Matsui's branch-and-bound search for the best trails of an SPN
+
+    Every round applies the S-box to all `num_sboxes` S-box positions and
+    then the linear layer (bit i of the state is bit i mod n of S-box
+    i // n). The weight of a trail is the sum of -log2 of its S-box
+    transitions (probability for differentials, squared correlation for
+    linear trails); the best r-round weight B_r bounds every r-round trail.
+
+    B_r is found by iterative deepening on a weight limit, starting at
+    B_(r-1) + B_1. The search follows the per-input transition lists sorted
+    by weight, prunes a branch as soon as its weight plus the minimum cost
+    of the rest of the round plus B_(rounds left) reaches the limit, and
+    memoizes the best weight (or a lower bound) from every state and number
+    of rounds left, so later passes and longer searches reuse it. In round 1
+    only output differences/masks are enumerated, each at its cheapest
+    input, and in the last round only the cheapest output counts.
+    """
+
+    def __init__(self, sbox, layer, num_sboxes, kind='differential'):
+        """
+        Args:
+            sbox (list or SboxProfile): Bijective n-bit S-box
+            layer (list): Bit permutation or 0/1 matrix, see layer_matrix()
+            num_sboxes (int): S-boxes per round (state width n * num_sboxes)
+            kind (str): 'differential' or 'linear'
+        """
+        profile = as_profile(sbox)
+        if profile.input_bits != profile.output_bits:
+            raise ValueError('Trail search needs an S-box with as many output bits as input bits')
+
+        weights = transition_weights(profile, kind)
+        self.kind = kind
+        self.sbox_bits = profile.input_bits
+        self.num_sboxes = num_sboxes
+        self._sbox_mask = len(profile) - 1
+
+        # Transitions of every non-zero input, cheapest first
+        self.transitions = [[]] + [
+            [(float(weights[a, b]), b) for b in np.argsort(weights[a], kind='stable').tolist() if np.isfinite(weights[a, b])]
+            for a in range(1, len(profile))
+        ]
+        self.min_input = [0.0] + [row[0][0] for row in self.transitions[1:]]
+        finite = np.where(np.isfinite(weights[1:]), weights[1:], np.inf)
+        self.first_round = sorted(
+            (float(finite[:, b].min()), b) for b in range(1, len(profile)) if np.isfinite(finite[:, b].min())
+        )
+
+        # Differences move through M, masks through (M^T)^-1
+        matrix = layer_matrix(layer, self.sbox_bits * num_sboxes)
+        if kind == 'linear':
+            matrix = _gf2_inverse(matrix.T)
+        columns = [sum(1 << int(bit) for bit in np.flatnonzero(column)) for column in matrix.T]
+
+        # Layer image of every S-box output value at every position
+        self.contributions = []
+        for position in range(num_sboxes):
+            table = [0] * len(profile)
+            for value in range(1, len(profile)):
+                for bit in range(self.sbox_bits):
+                    if value >> bit & 1:
+                        table[value] ^= columns[position * self.sbox_bits + bit]
+            self.contributions.append(table)
+
+        # If the positions feed disjoint bits (e.g. bit permutations), the
+        # active S-boxes of the next round only grow while a round is
+        # expanded, so their count bounds the next round's weight early
+        supports = [reduce(operator.or_, table) for table in self.contributions]
+        self._disjoint = sum(supports) == reduce(operator.or_, supports)
+        self.touched = [[self._active_positions(value) for value in table] for table in self.contributions]
+
+        self.memo = {}
+        self.set_bounds([0.0])
+
+    def _active(self, state):
+        """(position, value) of every active S-box of a state"""
+        active = []
+        position = 0
+        while state:
+            value = state & self._sbox_mask
+            if value:
+                active.append((position, value))
+            state >>= self.sbox_bits
+            position += 1
+        return active
+
+    def _active_positions(self, state):
+        """Bit mask of the active S-box positions of a state"""
+        positions = 0
+        for position, _ in self._active(state):
+            positions |= 1 << position
+        return positions
+
+    def set_bounds(self, bounds):
+        """
+        Use B_0..B_k (B_0 = 0) as the known best weights
+
+        With disjoint layer images, round_bounds[r][c] also bounds r rounds
+        whose first round has at least c active S-boxes by c B_1 + B_(r-1).
+        """
+        self.bounds = list(bounds)
+        counts = range(self.num_sboxes + 1)
+        self.round_bounds = [[0.0] * len(counts)] + [
+            [max(self.bounds[r], count * self.bounds[1] + self.bounds[r - 1]) if self._disjoint else self.bounds[r]
+             for count in counts]
+            for r in range(1, len(self.bounds))
+        ]
+
+    def search(self, state, rounds, limit):
+        """
+        Best weight of `rounds` rounds starting from S-box layer input `state`
+
+        Returns:
+            float: The best weight if it is below `limit`, otherwise a lower
+            bound of at least `limit`
+        """
+        key = (rounds, state)
+        known = self.memo.get(key)
+        if known is not None and (known[1] or known[0] >= limit - _EPSILON):
+            return known[0]
+
+        active = self._active(state)
+        minimums = [self.min_input[value] for _, value in active]
+        if rounds == 1:
+            weight = sum(minimums)
+            self.memo[key] = (weight, True)
+            return weight
+
+        # own[i]: cheapest cost of the active S-boxes i.. of this round
+        own = [0.0] * (len(active) + 1)
+        for i in range(len(active) - 1, -1, -1):
+            own[i] = own[i + 1] + minimums[i]
+        later = self.round_bounds[rounds - 1]
+        best = [limit]
+        found = [False]
+
+        def expand(i, weight, output, touched):
+            if i == len(active):
+                total = weight + self.search(output, rounds - 1, best[0] - weight)
+                if total < best[0] - _EPSILON:
+                    best[0] = total
+                    found[0] = True
+                return
+            position, value = active[i]
+            contributions = self.contributions[position]
+            touches = self.touched[position]
+            for transition, out in self.transitions[value]:
+                cost = weight + transition + own[i + 1]
+                if cost + later[0] >= best[0] - _EPSILON:
+                    break
+                next_touched = touched | touches[out]
+                if cost + later[next_touched.bit_count()] >= best[0] - _EPSILON:
+                    continue
+                expand(i + 1, weight + transition, output ^ contributions[out], next_touched)
+
+        expand(0, 0.0, 0, 0)
+
+        if found[0]:
+            self.memo[key] = (best[0], True)
+        elif known is None or known[0] < limit:
+            self.memo[key] = (limit, False)
+        return best[0]
+
+    def search_first_round(self, rounds, limit, first_position):
+        """
+        Best weight of trails over `rounds` rounds whose first round has
+        its lowest active S-box at `first_position` (below `limit`, as in search())
+        """
+        later = self.round_bounds[rounds - 1]
+        best = [limit]
+
+        def extend(start, weight, output, touched):
+            if output:
+                total = weight + self.search(output, rounds - 1, best[0] - weight)
+                if total < best[0] - _EPSILON:
+                    best[0] = total
+            for position in range(start, self.num_sboxes):
+                contributions = self.contributions[position]
+                touches = self.touched[position]
+                for transition, out in self.first_round:
+                    cost = weight + transition
+                    if cost + later[0] >= best[0] - _EPSILON:
+                        break
+                    next_touched = touched | touches[out]
+                    if cost + later[next_touched.bit_count()] >= best[0] - _EPSILON:
+                        continue
+                    extend(position + 1, cost, output ^ contributions[out], next_touched)
+
+        contributions = self.contributions[first_position]
+        touches = self.touched[first_position]
+        for transition, out in self.first_round:
+            if transition + later[0] >= best[0] - _EPSILON:
+                break
+            if transition + later[touches[out].bit_count()] >= best[0] - _EPSILON:
+                continue
+            extend(first_position + 1, transition, contributions[out], touches[out])
+        return best[0]
+
+# One TrailSearch (and memo) per worker process and configuration
+_worker_searches = {}
+
+def _search_branch(config, bounds, rounds, limit, first_position):
+    """Worker entry point: one first-round branch of a deepening pass"""
+    search = _worker_searches.get(config)
+    if search is None:
+        sbox, layer, num_sboxes, kind = config
+        search = _worker_searches[config] = TrailSearch(list(sbox), layer, num_sboxes, kind)
+    search.set_bounds(bounds)
+    return search.search_first_round(rounds, limit, first_position)
+
+def best_trail_weights(sbox, layer, num_sboxes, rounds, kind='differential', workers=1):
+    """
+    Best trail weights B_1..B_rounds of an SPN over this S-box
+
+    No r-round trail has a probability (differential) or squared
+    correlation (linear) above 2^-B_r.
+
+    Args:
+        sbox (list or SboxProfile): Bijective n-bit S-box
+        layer (list): Bit permutation or 0/1 matrix, see layer_matrix()
+        num_sboxes (int): S-boxes per round
+        rounds (int): Largest number of rounds
+        kind (str): 'differential' or 'linear'
+        workers (int): Worker processes for the first-round branches, None
+            uses os.cpu_count()
+
+    Returns:
+        list: B_1..B_rounds, -log2 weights (e.g. PRESENT differential:
+        2, 4, 8, 12, 20)
+    """
+    search = TrailSearch(sbox, layer, num_sboxes, kind)
+    workers = workers or os.cpu_count() or 1
+    config = (tuple(as_profile(sbox).tolist()), _hashable(layer), num_sboxes, kind)
+    executor = ProcessPoolExecutor(max_workers=workers) if workers > 1 and rounds > 1 else None
+
+    try:
+        search.set_bounds([0.0, min(search.min_input[1:])])
+        for round_count in range(2, rounds + 1):
+            lower = search.bounds[round_count - 1] + search.bounds[1]
+            limit = math.floor(lower + _EPSILON) + 1
+
+            while True:
+                positions = range(num_sboxes)
+                if executor is None:
+                    best = min(search.search_first_round(round_count, limit, position) for position in positions)
+                else:
+                    best = min(executor.map(
+                        _search_branch, repeat(config), repeat(tuple(search.bounds)),
+                        repeat(round_count), repeat(limit), positions
+                    ))
+                if best < limit - _EPSILON:
+                    break
+                limit += 1
+
+            search.set_bounds(search.bounds + [best])
+    finally:
+        if executor is not None:
+            executor.shutdown()
+
+    return search.bounds[1:rounds + 1]
+
+def _hashable(layer):
+    """Layer as nested tuples, usable as a cache key"""
+    layer = np.asarray(layer)
+    return tuple(map(tuple, layer.tolist())) if layer.ndim == 2 else tuple(layer.tolist())
@@ -0,0 +1,156 @@
+import numpy as np
+from .helpers import default_output_bits
+
+# Work on at most this many table entries at once for large S-boxes
+_BLOCK_ENTRIES = 1 << 22
+
+def spectrum_dtype(num_inputs):
+    """
+    Smallest signed dtype that holds every FWHT intermediate for 2^n inputs
+
+    Butterfly values never exceed 2^n in magnitude.
+    """
+    if num_inputs <= 64:
+        return np.int8
+    if num_inputs <= 1 << 14:
+        return np.int16
+    return np.int32
+
+def fast_walsh_hadamard(table, dtype=np.int32):
+    """
+    Fast Walsh-Hadamard transform along the last axis
+
+    Args:
+        table (array): +1/-1 (or integer) values, last axis of length 2^n
+        dtype: Integer dtype used for the (copied) output
+
+    Returns:
+        np.ndarray: Transformed array, same shape as the input
+    """
+    spectrum = np.array(table, dtype=dtype)
+    size = spectrum.shape[-1]
+    lead = spectrum.shape[:-1]
+
+    h = 1
+    while h < size:
+        # Butterfly (a, b) -> (a + b, a - b) on every block of width 2h
+        blocks = spectrum.reshape(*lead, size // (2 * h), 2, h)
+        left = blocks[..., 0, :].copy()
+        blocks[..., 0, :] += blocks[..., 1, :]
+        blocks[..., 1, :] = left - blocks[..., 1, :]
+        h *= 2
+
+    return spectrum
+
+def component_signs(sbox, output_bits=8):
+    """
+    Build the (-1)^(b . S(x)) table of every component function
+
+    Rows are built by doubling: the sign row of b xor 2^k is the sign row
+    of b times the sign row of output bit k.
+
+    Args:
+        sbox (list): Input S-box of length 2^n
+        output_bits (int): Output width m of the S-box
+
+    Returns:
+        np.ndarray: int8 array of shape (2^m, 2^n), row b is the component b . S
+    """
+    values = np.asarray(sbox, dtype=np.int64)
+    signs = np.empty((1 << output_bits, len(values)), dtype=np.int8)
+    signs[0] = 1
+
+    for bit in range(output_bits):
+        coordinate = (1 - 2 * ((values >> bit) & 1)).astype(np.int8)
+        signs[1 << bit:2 << bit] = signs[:1 << bit] * coordinate
+
+    return signs
+
+def walsh_spectrum(sbox, output_bits=8):
+    """
+    Walsh spectrum of all component functions of the S-box
+
+    W[b, a] = sum_x (-1)^(b . S(x) xor a . x)
+
+    The dtype is the smallest one that fits 2^n; large S-boxes are
+    transformed in blocks of rows to bound peak memory.
+
+    Returns:
+        np.ndarray: Array of shape (2^m, 2^n) indexed by [output mask, input mask]
+    """
+    signs = component_signs(sbox, output_bits)
+    num_masks, num_inputs = signs.shape
+    dtype = spectrum_dtype(num_inputs)
+
+    rows_per_block = max(1, _BLOCK_ENTRIES // num_inputs)
+    if num_masks <= rows_per_block:
+        return fast_walsh_hadamard(signs, dtype)
+
+    spectrum = np.empty(signs.shape, dtype=dtype)
+    for start in range(0, num_masks, rows_per_block):
+        stop = start + rows_per_block
+        spectrum[start:stop] = fast_walsh_hadamard(signs[start:stop], dtype)
+    return spectrum
+
+def linear_approximation_table(sbox, output_bits=8):
+    """
+    Linear Approximation Table: #{x : a . x = b . S(x)} - 2^(n-1)
+
+    Returns:
+        np.ndarray: Array of shape (2^m, 2^n) indexed by [output mask, input mask]
+    """
+    return walsh_spectrum(sbox, output_bits) // 2
+
+def batch_walsh_spectrum(sboxes, output_bits=None):
+    """
+    Walsh spectra of a stack of S-boxes at once
+
+    Args:
+        sboxes (array): Shape (k, 2^n), one S-box per row
+        output_bits (int): Output width m, default_output_bits() of the
+            largest value when omitted
+
+    Returns:
+        np.ndarray: Array (k, 2^m, 2^n) indexed by [S-box, output mask, input mask]
+    """
+    values = np.asarray(sboxes, dtype=np.int64)
+    num_sboxes, num_inputs = values.shape
+    if output_bits is None:
+        output_bits = default_output_bits(num_inputs, values.max())
+
+    # Component signs by doubling over the output bits, as in component_signs()
+    planes = 1 - 2 * ((values[:, :, None] >> np.arange(output_bits)) & 1).astype(np.int8)  # (k, 2^n, m)
+    signs = np.empty((num_sboxes, 1 << output_bits, num_inputs), dtype=np.int8)
+    signs[:, 0] = 1
+    for bit in range(output_bits):
+        signs[:, 1 << bit:2 << bit] = signs[:, :1 << bit] * planes[:, None, :, bit]
+
+    return fast_walsh_hadamard(signs, spectrum_dtype(num_inputs))
+
+def autocorrelation_from_spectrum(spectrum):
+    """
+    Autocorrelation of every component from its Walsh spectrum
+
+    r_b(a) = sum_x (-1)^(b . (S(x) xor S(x xor a))) is the inverse
+    Walsh-Hadamard transform of W[b]^2 (Wiener-Khinchin), so a row costs
+    O(n 2^n) instead of O(4^n). Large tables are transformed in blocks of
+    rows.
+
+    Args:
+        spectrum (array): Walsh spectra, last axis of length 2^n
+
+    Returns:
+        np.ndarray: int64 array of the same shape, indexed [..., output mask, input difference]
+    """
+    num_inputs = spectrum.shape[-1]
+    shift = num_inputs.bit_length() - 1
+    rows = spectrum.reshape(-1, num_inputs)
+    table = np.empty(rows.shape, dtype=np.int64)
+
+    rows_per_block = max(1, _BLOCK_ENTRIES // num_inputs)
+    for start in range(0, len(rows), rows_per_block):
+        squared = rows[start:start + rows_per_block].astype(np.int64) ** 2
+        # The transform is its own inverse up to the factor 2^n (an exact shift)
+        table[start:start + rows_per_block] = fast_walsh_hadamard(squared, np.int64) >> shift
+
+    return table.reshape(spectrum.shape)